@@ -5,15 +5,19 @@ import dash_core_components as dcc
 import dash_html_components as html
 
 # MiRo dashboard modules
+from views.faces import affect_face_grid, sleep_face_list, AFFECT_STEP, SLEEP_STEP
 from views.modals import dashboard_modals
 from views.rows import dashboard_rows
 from views.tooltips import dashboard_tooltips
 from controllers.intervals import dashboard_intervals
 
 # See other included themes: https://bootswatch.com
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
+# Responses are compressed by models/encoding.py, so Dash's own Flask-Compress is turned off rather than run as well
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY], compress=False)
 app.title = 'MiRo Dashboard'
 app.layout = html.Div([
+	# Page URL; '?robot=<name>' chooses which robot the page shows
+	dcc.Location(id='url'),
 	dashboard_rows['Row_top'],
 	dashboard_rows['Row_1'],
 	dashboard_rows['Row_2'],
@@ -26,11 +30,29 @@ app.layout = html.Div([
 	dashboard_modals,
 	dashboard_tooltips,
 	dashboard_intervals,
+	# Face lookup table for choosing affect and sleep faces in the browser
 	dcc.Store(
-		id='motivation_memory',
+		id='face-table',
 		data={
-			'social': [],
-			'ball'  : [],
+			'affect'     : affect_face_grid,
+			'affect_step': AFFECT_STEP,
+			'sleep'      : sleep_face_list,
+			'sleep_step' : SLEEP_STEP,
 		}
 	),
+	# MiRo's time of day, for drawing the circadian clock in the browser
+	dcc.Store(id='circadian-time'),
+	# Data versions (topic sequence numbers) already sent to each graph, so idle displays send nothing
+	dcc.Store(id='action-seq', data={}),
+	dcc.Store(id='affect-seq', data={}),
+	dcc.Store(id='sleep-seq', data={}),
+	dcc.Store(id='affect-trail-seq', data=0),
+	# Motivation history samples already sent to each graph
+	dcc.Store(id='motivation-seq', data={}),
+	# Graph updates in binary form, waiting to be unpacked in the browser (see assets/clientside.js)
+	dcc.Store(id='action-graph-packed'),
+	dcc.Store(id='action-graph-large-packed'),
+	dcc.Store(id='affect-trail-graph-packed'),
+	dcc.Store(id='motivation-graph-packed'),
+	dcc.Store(id='motivation-graph-large-packed'),
 ])
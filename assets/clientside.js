@@ -0,0 +1,148 @@
+// Dash clientside callbacks (see models/callback_modal.py, models/callback_slow.py and models/callback_fast.py)
+// These run in the browser, so need no server round trip
+(function () {
+	function bucket(value, step, count) {
+		// Index of the (lower, upper] bucket containing value, or -1 if it's outside all of them (as views/faces.py)
+		var i = Math.ceil(value / step) - 1;
+		return (i >= 0 && i < count) ? i : -1;
+	}
+
+	function newestPoint(extend, trace) {
+		// Newest [x, y] given to one trace by a graph's 'extendData', or null if that trace wasn't extended
+		if (!extend) {
+			return null;
+		}
+		var index = extend[1].indexOf(trace);
+		if (index < 0) {
+			return null;
+		}
+		var x = extend[0].x[index];
+		var y = extend[0].y[index];
+
+		return [x[x.length - 1], y[y.length - 1]];
+	}
+
+	var typedArrays = {
+		f4: Float32Array,
+		f8: Float64Array,
+		i2: Int16Array,
+		i4: Int32Array,
+		u1: Uint8Array,
+		u2: Uint16Array
+	};
+
+	function unpackArray(value) {
+		// Plotly's binary array form ({dtype, bdata}) to a plain array; anything else is returned as it is
+		if (!value || !value.bdata) {
+			return value;
+		}
+		var bytes = atob(value.bdata);
+		var buffer = new Uint8Array(bytes.length);
+		for (var i = 0; i < bytes.length; i++) {
+			buffer[i] = bytes.charCodeAt(i);
+		}
+
+		return Array.from(new typedArrays[value.dtype](buffer.buffer));
+	}
+
+	function setFace(id, face) {
+		// Swap the background face image of a graph in place, only when it changes
+		// Returning a new figure instead would also replace the graph's data with that of its 'figure' prop, which
+		// 'extendData' never updates, and so wipe the markers
+		var graph = document.getElementById(id);
+		var plot = graph && graph.getElementsByClassName('js-plotly-plot')[0];
+		if (plot && window.Plotly && plot.layout && plot.layout.images && plot.layout.images[0].source !== face) {
+			Plotly.relayout(plot, {'images[0].source': face});
+		}
+
+		return window.dash_clientside.no_update;
+	}
+
+	window.dash_clientside = Object.assign({}, window.dash_clientside, {
+		dashboard: {
+			toggle_modal: function (n1, n2, is_open) {
+				if (n1 || n2) {
+					return !is_open;
+				}
+				return is_open;
+			},
+
+			unpack_extend: function (packed) {
+				// Turn an 'extendData' update carrying binary arrays back into one the graph can use
+				if (!packed) {
+					return window.dash_clientside.no_update;
+				}
+				var update = {};
+				Object.keys(packed[0]).forEach(function (key) {
+					update[key] = packed[0][key].map(unpackArray);
+				});
+
+				return [update].concat(packed.slice(1));
+			},
+
+			circadian_figure: function (time_raw, figure) {
+				// Multiply fractional day by 720 to get 12-hour time
+				// Subtract 30 because polar clock display uses 1 as the origin
+				var circ_hrs = (time_raw * 720) - 30;
+
+				// Remainder from raw time * 24 == minutes
+				var raw_min = (time_raw * 24) % 1;
+				var circ_min = (raw_min * 360) - 30;
+
+				// Set clock hand width and length
+				var hand_width = 40;
+				var hr_hand_length = 0.6;
+				var min_hand_length = 0.9;
+
+				function hand(angle, length, colour) {
+					return {
+						type     : 'scatterpolar',
+						fill     : 'toself',
+						fillcolor: colour,
+						hoverinfo: 'none',
+						line     : {
+							color: 'black',
+							width: 0.5
+						},
+						mode     : 'lines',
+						r        : [0, 0.1, length, 0.1, 0],
+						theta    : [0, angle - hand_width, angle, angle + hand_width, 0]
+					};
+				}
+
+				return {
+					data  : [
+						// Minute hand
+						hand(circ_min, min_hand_length, 'lightsteelblue'),
+						// Hour hand
+						hand(circ_hrs, hr_hand_length, 'steelblue')
+					],
+					layout: figure.layout
+				};
+			},
+
+			affect_face: function (extend, id, table) {
+				// The affect face follows mood, which is trace 1 on both affect graphs
+				var point = newestPoint(extend, 1);
+				if (!point) {
+					return window.dash_clientside.no_update;
+				}
+				var v = bucket(point[0], table.affect_step.valence, table.affect.length);
+				var a = bucket(point[1], table.affect_step.arousal, table.affect[0].length);
+
+				return setFace(id, (v < 0 || a < 0) ? null : table.affect[v][a]);
+			},
+
+			sleep_face: function (extend, id, table) {
+				// The sleep face follows wakefulness only
+				var point = newestPoint(extend, 0);
+				if (!point) {
+					return window.dash_clientside.no_update;
+				}
+				var w = bucket(point[0], table.sleep_step, table.sleep.length);
+
+				return setFace(id, w < 0 ? null : table.sleep[w]);
+			}
+		}
+	});
+})();
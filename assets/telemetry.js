@@ -0,0 +1,106 @@
+// Applies telemetry pushed from the server (see models/telemetry.py) to the existing dcc.Graph figures
+// Only active when the layout's 'telemetry-source' element carries a URL, ie. when TELEMETRY_PUSH is set
+(function () {
+	var faces = {};
+	var lastTick = 0;
+
+	function getPlot(id) {
+		// dcc.Graph renders its Plotly plot in a child of the element carrying the component ID
+		var graph = document.getElementById(id);
+		if (!graph || !window.Plotly) {
+			return null;
+		}
+		var plot = graph.getElementsByClassName('js-plotly-plot')[0];
+
+		return plot && plot.data ? plot : null;
+	}
+
+	function restyle(id, update, traces) {
+		var plot = getPlot(id);
+		if (plot && plot.data.length >= traces.length) {
+			Plotly.restyle(plot, update, traces);
+		}
+	}
+
+	function setFace(id, source) {
+		// Faces are layout images, so only relayout when the face actually changes
+		var plot = getPlot(id);
+		if (plot && source && faces[id] !== source) {
+			faces[id] = source;
+			Plotly.relayout(plot, {'images[0].source': source});
+		}
+	}
+
+	function applyAction(data) {
+		var update = {x: [data.priority, data.inhibition]};
+		restyle('action-graph', update, [0, 1]);
+		restyle('action-graph-large', update, [0, 1]);
+	}
+
+	function applyAffect(data) {
+		restyle('affect-graph', {
+			x: [[data.emotion[0]], [data.mood[0]], [data.sleep[0]]],
+			y: [[data.emotion[1]], [data.mood[1]], [data.sleep[1]]]
+		}, [0, 1, 2]);
+		restyle('affect-graph-large', {
+			x: [[data.emotion[0]], [data.mood[0]]],
+			y: [[data.emotion[1]], [data.mood[1]]]
+		}, [0, 1]);
+		restyle('sleep-graph-large', {x: [[data.sleep[0]]], y: [[data.sleep[1]]]}, [0]);
+		setFace('affect-graph', data.affect_face);
+		setFace('affect-graph-large', data.affect_face);
+		setFace('sleep-graph-large', data.sleep_face);
+	}
+
+	function applyMotivation(data, maxPoints) {
+		['motivation-graph', 'motivation-graph-large'].forEach(function (id) {
+			var plot = getPlot(id);
+			if (plot && plot.data.length >= 2) {
+				Plotly.extendTraces(plot, {y: data}, [0, 1], maxPoints);
+			}
+		});
+	}
+
+	function tick(tickMs) {
+		// Runs the Dash callbacks that use 'telemetry-tick' in place of the disabled 'interval-fast'
+		var now = Date.now();
+		var element = document.getElementById('telemetry-tick');
+		if (element && now - lastTick >= tickMs) {
+			lastTick = now;
+			element.click();
+		}
+	}
+
+	function connect(url, maxPoints, tickMs) {
+		var source = new EventSource(url);
+		source.onmessage = function (event) {
+			var update = JSON.parse(event.data);
+			if (update.action) {
+				applyAction(update.action);
+			}
+			if (update.affect) {
+				applyAffect(update.affect);
+			}
+			if (update.motivation) {
+				applyMotivation(update.motivation, maxPoints);
+			}
+			tick(tickMs);
+		};
+	}
+
+	// The layout is rendered by Dash after this script loads, so wait for the configuration element to appear
+	var waitForLayout = setInterval(function () {
+		var config = document.getElementById('telemetry-source');
+		if (config) {
+			clearInterval(waitForLayout);
+			if (config.dataset.url) {
+				// Pass on the page's query string, which chooses the robot
+				connect(
+					config.dataset.url + window.location.search,
+					parseInt(config.dataset.maxPoints, 10),
+					parseFloat(config.dataset.tickMs)
+				);
+			}
+		}
+	}, 100);
+})();
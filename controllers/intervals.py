@@ -2,24 +2,38 @@
 import dash_core_components as dcc
 import dash_html_components as html
 
+# MiRo dashboard modules
+import dashboard_constants as con
+
+# Too short an interval causes issues as not all plots can be updated before the next callback
+# Every tenth of a second
+FAST_INTERVAL = 0.1 * 1000
+
 dashboard_intervals = html.Div([
 	dcc.Interval(
 		id='interval-fast',
-		# Too short an interval causes issues as not all plots can be updated before the next callback
-		# Every tenth of a second
-		interval=0.1 * 1000,
-		n_intervals=0
-	),
-	dcc.Interval(
-		id='interval-medium',
-		# Every fifth of a second
-		interval=0.2 * 1000,
-		n_intervals=0
+		interval=FAST_INTERVAL,
+		n_intervals=0,
+		# With telemetry pushed to the browser, this only fires once to draw the initial figures
+		disabled=con.TELEMETRY_PUSH
 	),
+	# Stands in for 'interval-fast' when telemetry is pushed: assets/telemetry.js clicks it as events arrive (at most
+	# once per FAST_INTERVAL), so callbacks for displays the stream doesn't carry keep running
+	html.Div(id='telemetry-tick', hidden=True, n_clicks=0),
 	dcc.Interval(
 		id='interval-slow',
 		# Every minute
 		interval=60 * 1000,
 		n_intervals=0
+	),
+	# Tells assets/telemetry.js where to connect for pushed telemetry
+	html.Div(
+		id='telemetry-source',
+		hidden=True,
+		**{
+			'data-url'       : con.TELEMETRY_PATH if con.TELEMETRY_PUSH else '',
+			'data-max-points': con.MOTIVATION_LENGTH,
+			'data-tick-ms'   : FAST_INTERVAL
+		}
 	)
 ])
@@ -20,7 +20,76 @@ CAM_WIDTH = CAM_HEIGHT * 1.7777
 CAM_HEIGHT_LARGE = 290
 CAM_WIDTH_LARGE = CAM_HEIGHT_LARGE * 1.7777
 CAM_SCALE = 3
+# Show lens-corrected camera images; off by default as salience maps are computed from the uncorrected frames
+CAM_UNDISTORT = False
+# Forward camera JPEGs to the browser untouched whenever no pixel processing (eg. undistortion) is needed
+CAM_PASSTHROUGH = True
+# JPEG quality (0-100) of streamed images that have to be re-encoded
+CAM_QUALITY = 80
+PRI_QUALITY = 90
+# Number of encoded images kept in the shared encode cache
+ENCODE_CACHE_SIZE = 64
 PRI_OPACITY = 0.5
 PRIW_HEIGHT = 30
 PRIW_WIDTH = CAM_WIDTH * 2
+# Affect samples drawn in the trajectory view (at most AFFECT_HISTORY_LENGTH in miro_constants)
+AFFECT_TRAIL_LENGTH = 30000
+MOTIVATION_CARD = False
+# Motivation samples shown, at the rate the robot publishes them
 MOTIVATION_LENGTH = 30
+# Motion JPEG image streams: URL path (streams send each frame as it arrives)
+STREAM_PATH = '/stream/'
+# Seconds after which an idle stream sends its last frame again, so connections closed by the browser are noticed
+STREAM_KEEPALIVE = 5
+# Push numeric telemetry to the browser as server-sent events instead of polling on 'interval-fast'
+# The graphs then follow the robot's topics directly, at the cost of bypassing Dash for these updates
+# Off by default: pushed updates leave Dash's copy of each figure stale, and every open page holds a stream (and a
+# server thread) for telemetry as well as its images; displays the stream doesn't carry are run by 'telemetry-tick'
+TELEMETRY_PUSH = False
+TELEMETRY_PATH = '/telemetry'
+# Least seconds between events on one connection; topics publishing faster are batched
+TELEMETRY_INTERVAL = 0.02
+# Subscribe to ROS topics in a separate ingest process, which shares robot data with web workers through shared
+# memory (see models/basic_functions/telemetry_bus.py), so ingest and serving can run on separate cores
+TELEMETRY_BUS = False
+# Downsampled history of MiRoCore's time series: URL path, default range (seconds) and width (points), and the
+# largest width a query may ask for
+HISTORY_PATH = '/history/'
+HISTORY_SECONDS = 3600
+HISTORY_WIDTH = 500
+HISTORY_MAX_WIDTH = 4000
+# Serialise responses with orjson (when installed) rather than plotly's pure-Python encoder
+FAST_JSON = True
+# Type of numeric arrays sent to graphs in binary form; float32 is plenty for values displayed at graph resolution
+TYPED_ARRAY_DTYPE = 'f4'
+# Compress responses of at least this many bytes, with brotli if installed and accepted, otherwise gzip
+COMPRESS_MIN_SIZE = 1024
+BROTLI_QUALITY = 4
+GZIP_LEVEL = 6
+# The page layout only changes on restart, so it's serialised and compressed once (see models/layout_cache.py), at
+# the highest quality as that's only paid once; browsers check it's current with its ETag on every page load
+LAYOUT_BROTLI_QUALITY = 11
+LAYOUT_GZIP_LEVEL = 9
+LAYOUT_CACHE_CONTROL = 'no-cache'
+# Encode time and bytes sent for callback responses, and how often stream frames are reused rather than encoded again
+STATS_PATH = '/stats'
+# Serving (see models/serving.py, and 'python index.py --help' to override these)
+# Address and port, threads for ordinary requests, and the most streams open at once (each takes a thread of its own)
+SERVER_HOST = '0.0.0.0'
+SERVER_PORT = 8050
+SERVER_THREADS = 8
+# Each open page holds up to STREAMS_PER_PAGE streams: the wide salience map and both cameras, the left and right
+# salience maps when shown, and the telemetry events (modals' large images hold more while open)
+# The stream limit, and with it the thread pool, is sized for VIEWERS pages open at once; beyond that, images are
+# turned away (503) until other pages close
+VIEWERS = 16
+STREAMS_PER_PAGE = 6
+STREAM_LIMIT = VIEWERS * STREAMS_PER_PAGE
+# Requests waiting for a thread beyond which new ones are turned away (503) until the queue drains
+QUEUE_LIMIT = 32
+# Open connections, connections waiting to be accepted, and seconds before an idle connection is closed
+CONNECTION_LIMIT = 500
+BACKLOG = 1024
+CHANNEL_TIMEOUT = 60
+# Seconds clients are asked to wait after being turned away
+RETRY_AFTER = 1
@@ -1,13 +1,36 @@
+# MiRo dashboard modules
+from models import startup
+
 # Plotly Dash modules
 from app import app
 
 # MiRo dashboard modules
+import dashboard_constants as con
 # PyCharm will complain these imports are unused, but they definitely are
 # Comment these out to test / modify basic layout without a running ROS core
 import models.callback_fast
 import models.callback_medium
 import models.callback_slow
 import models.callback_modal
+import models.callback_robot
+import models.encoding
+import models.history
+import models.layout_cache
+import models.serving
+import models.streams
+import models.telemetry
+from models.robots import get_core, get_perception, robots
+
+# Other modules
+import argparse
+import multiprocessing
+import threading
+
+# ROS and OpenCV aren't imported here: they take longer to load than the rest of the dashboard put together, so they
+# are loaded in the background while the server starts up; see start_clients()
+startup.phase('Layout and callbacks')
+models.layout_cache.layout_cache.prepare()
+startup.phase('Layout serialised')
 
 # Separation of app.py and index.py required to allow definition of callbacks in separate files
 # See bottom of https://dash.plotly.com/urls
@@ -15,11 +38,117 @@ import models.callback_modal
 # TODO: Package into easy-install app bundle
 # TODO: Move from Scatter() to ScatterGL() (see: https://plot.ly/python/webgl-vs-svg/)
 
+
+def start_clients():
+	# Connect to every robot in the background while the web server comes up
+	# With the telemetry bus, this only loads the bus readers; the ingest process subscribes to ROS
+	from models.basic_functions import miro_ros_interface as mri
+	import cv2
+	startup.phase('ROS and OpenCV imported')
+
+	for robot in robots:
+		get_core(robot)
+		get_perception(robot)
+	startup.phase('Robot clients started')
+
+	if not con.TELEMETRY_BUS:
+		# Log how long each topic (of every robot) took to go live so slow topics can be spotted after a restart
+		mri.print_startup_report(mri.start_clients([mri.MiRoCore, mri.MiRoPerception], timeout=10))
+
+
+def run_ingest():
+	# Ingest process for the telemetry bus; the bus (and ROS with it) is only imported in that process
+	from models.basic_functions import telemetry_bus as bus
+	bus.run_ingest()
+
+
+def parse_args():
+	parser = argparse.ArgumentParser(description='MiRo dashboard')
+	parser.add_argument(
+		'--production',
+		action='store_true',
+		help='serve with waitress (if installed) instead of the Flask development server'
+	)
+	parser.add_argument('--host', default=con.SERVER_HOST, help='address to listen on (default: %(default)s)')
+	parser.add_argument('--port', type=int, default=con.SERVER_PORT, help='port to listen on (default: %(default)s)')
+	parser.add_argument(
+		'--threads',
+		type=int,
+		default=con.SERVER_THREADS,
+		help='production worker threads for ordinary requests (default: %(default)s)'
+	)
+	parser.add_argument(
+		'--viewers',
+		type=int,
+		default=con.VIEWERS,
+		help='pages expected to be open at once, each holding up to {} streams (default: %(default)s)'.format(
+			con.STREAMS_PER_PAGE
+		)
+	)
+	parser.add_argument(
+		'--stream-limit',
+		type=int,
+		help='most image and telemetry streams open at once, each with a thread of its own (default: viewers x {})'
+		.format(con.STREAMS_PER_PAGE)
+	)
+	parser.add_argument(
+		'--queue-limit',
+		type=int,
+		default=con.QUEUE_LIMIT,
+		help='production request queue length beyond which requests are turned away (default: %(default)s)'
+	)
+	parser.add_argument(
+		'--connection-limit',
+		type=int,
+		default=con.CONNECTION_LIMIT,
+		help='most open production connections (default: %(default)s)'
+	)
+	parser.add_argument(
+		'--backlog',
+		type=int,
+		default=con.BACKLOG,
+		help='production connections waiting to be accepted (default: %(default)s)'
+	)
+
+	args = parser.parse_args()
+	if args.stream_limit is None:
+		args.stream_limit = args.viewers * con.STREAMS_PER_PAGE
+
+	return args
+
+
 if __name__ == '__main__':
+	args = parse_args()
+
 	# Enable to suppress warnings TEMPORARILY
 	# app.config['suppress_callback_exceptions'] = True
 
-	# "debug=False" because hot reloading causes "IOError: [Errno 11] Resource temporarily unavailable" errors
-	# "host='0.0.0.0'" allows connections from non-localhost addresses
-	# I *think* "threaded=True" gives a performance boost to multiple callbacks
-	app.run_server(debug=False, host='0.0.0.0', threaded=True)
+	# Topics come up in the background; until then the displays show their placeholder data
+	if con.TELEMETRY_BUS:
+		# ROS is left to the ingest process, which ends with this one
+		multiprocessing.Process(target=run_ingest, daemon=True).start()
+	threading.Thread(target=start_clients, daemon=True).start()
+
+	if args.production and models.serving.waitress is not None:
+		models.serving.serve(
+			args.host,
+			args.port,
+			args.threads,
+			args.stream_limit,
+			args.queue_limit,
+			args.connection_limit,
+			args.backlog
+		)
+	else:
+		if args.production:
+			print('waitress is not installed, so using the development server')
+
+		# The development server starts a thread per request, so only streams can be limited
+		models.serving.guard(args.stream_limit, args.queue_limit)
+
+		startup.phase('Starting development server')
+
+		# "debug=False" because hot reloading causes "IOError: [Errno 11] Resource temporarily unavailable" errors
+		# "host='0.0.0.0'" allows connections from non-localhost addresses
+		# I *think* "threaded=True" gives a performance boost to multiple callbacks
+		app.run_server(debug=False, host=args.host, port=args.port, threaded=True)
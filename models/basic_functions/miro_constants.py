@@ -28,6 +28,28 @@ PRIW = {
 	'height': 1
 }
 
+#####
+# History
+# Samples kept per signal in server-side history buffers (see RingBuffer)
+HISTORY_LENGTH = 500
+# Emotion and mood history is kept much longer, for drawing trajectories
+AFFECT_HISTORY_LENGTH = 30000
+# Multi-resolution time series (see time_series.py): bucket widths (seconds) of each aggregated level, and buckets
+# kept per level; with 8192 buckets the levels hold about 14 minutes, 2.3 hours, 23 hours and 9.5 days
+SERIES_WIDTHS = [0.1, 1, 10, 100]
+SERIES_CAPACITY = 8192
+
+#####
+# Telemetry bus (see telemetry_bus.py)
+# Shared memory blocks are named BUS_NAME + '_' + robot name; frames and state larger than their slots are dropped
+BUS_NAME = 'miro_dashboard'
+BUS_FRAME_SIZE = 2 ** 20
+BUS_STATE_SIZE = 2 ** 14
+# How often (seconds) readers look for a bus that isn't there yet
+BUS_RETRY = 1.0
+# Seconds between a web worker's checks for new bus data, made once per robot for all of the worker's streams
+BUS_POLL = 0.01
+
 #####
 # Basic colours (as https://pypi.org/project/colour/ is not installed on MiRo)
 BGR_TUPLE = {
@@ -7,66 +7,457 @@ from miro2_msg import msg
 # MiRo-E modules and parameters
 try:
 	from . import miro_constants as con
+	from .robot_config import robot_names
+	from .shared_state import SeqLock
+	from .time_series import TimeSeries
 except ImportError:
 	import miro_constants as con
+	from robot_config import robot_names
+	from shared_state import SeqLock
+	from time_series import TimeSeries
 import miro2 as miro
 
 # Other packages
+from concurrent.futures import ThreadPoolExecutor
+import collections
+import contextlib
 import cv2
 import datetime
+import functools
+import itertools
 import math
 import numpy as np
 import os
-import rosnode
 import rospy
+import struct
+import threading
+import time
+
+# Process-wide interface instances, one per class and robot (see get_client())
+_clients = {}
+# Clients being created, with an event set once each is done (or has failed)
+_clients_building = {}
+_clients_lock = threading.Lock()
+_node_lock = threading.Lock()
+
+# Small worker pool shared by all frame mailboxes, keeping image decoding off the rospy callback threads
+_decode_pool = ThreadPoolExecutor(max_workers=2)
+
+
+def get_client(cls, robot=None, **kwargs):
+	# Return the shared instance of a MiRo interface class for one robot (default: the first), creating it on first use
+	# (with any keyword arguments given)
+	# Every consumer in the process reads the same instance, so each topic is subscribed to and processed only once
+	# All robots share the one ROS node, decode pool and undistortion tables
+	# Clients are created outside the lock (starting the node and subscribing take a while), so other clients can be
+	# fetched or created meanwhile; anyone else asking for the same client waits for it
+	if robot is None:
+		robot = robot_names()[0]
+	key = (cls, robot)
+	while True:
+		with _clients_lock:
+			if key in _clients:
+				return _clients[key]
+			building = _clients_building.get(key)
+			if building is None:
+				building = _clients_building[key] = threading.Event()
+				break
+		# Look again once it's done, in case creating it failed
+		building.wait()
+
+	try:
+		client = cls(robot, **kwargs)
+		with _clients_lock:
+			_clients[key] = client
+	finally:
+		with _clients_lock:
+			del _clients_building[key]
+		building.set()
+
+	return client
+
+
+def start_clients(classes, timeout=5.0, robots=None):
+	# Create the shared clients for all classes and robots, so every subscription is set up at once, then wait in
+	# parallel for each topic's first message until a common deadline
+	# Returns how long (seconds) each topic took to go live, or None for topics that timed out
+	clients = [get_client(cls, robot) for robot in (robots or robot_names()) for cls in classes]
+	deadline = time.time() + timeout
+
+	report = {}
+	for client in clients:
+		report.update(client.wait_until_ready(max(0, deadline - time.time())))
+
+	return report
+
+
+def print_startup_report(report):
+	# Slowest topics first, as these are the ones holding up a restart
+	for topic in sorted(report, key=lambda t: float('inf') if report[t] is None else report[t], reverse=True):
+		if report[topic] is None:
+			print('{:<40} not live'.format(topic))
+		else:
+			print('{:<40} live after {:.3f}s'.format(topic, report[topic]))
+
+
+class FrameMailbox:
+	# Latest-only handoff between a rospy callback and the decode pool
+	# A frame arriving while an earlier one is still waiting replaces it, so stale frames are dropped instead of
+	# queueing up behind a slow decode and the displayed image never lags by more than one decode
+	def __init__(self, process):
+		self.process = process
+		self.lock = threading.Lock()
+		self.pending = None
+		self.busy = False
+		self.dropped = 0
+
+	def put(self, frame):
+		with self.lock:
+			if self.pending is not None:
+				self.dropped += 1
+			self.pending = frame
+			if self.busy:
+				return
+			self.busy = True
+
+		_decode_pool.submit(self.drain)
+
+	def drain(self):
+		# Process frames until the mailbox is empty; at most one drain runs per mailbox at any time
+		while True:
+			with self.lock:
+				frame = self.pending
+				self.pending = None
+				if frame is None:
+					self.busy = False
+					return
 
+			try:
+				self.process(frame)
+			except Exception as e:
+				print('Frame processing failed: {}'.format(e))
 
-class MiRo:
+
+class Changes:
+	# Wakes threads waiting for a client's values (topics, frames) to change, so that consumers such as image streams
+	# needn't poll for them
 	def __init__(self):
+		self.lock = threading.Lock()
+		self.watchers = collections.defaultdict(set)
+
+	def notify(self, name):
+		with self.lock:
+			for event in self.watchers.get(name, ()):
+				event.set()
+
+	@contextlib.contextmanager
+	def watching(self, names):
+		# Event set whenever any of 'names' changes, for as long as the context is open
+		# Clear it before checking for changes, so one arriving meanwhile isn't missed
+		event = threading.Event()
+		with self.lock:
+			for name in names:
+				self.watchers[name].add(event)
+		try:
+			yield event
+		finally:
+			with self.lock:
+				for name in names:
+					self.watchers[name].discard(event)
+
+
+class RingBuffer:
+	# Fixed-size history of multi-channel samples, written by a rospy callback at the topic's own rate
+	# Readers keep the running sample count they last saw and ask only for what came after it, so any number of
+	# readers can follow the same history without copying it around
+	# Arrays come from 'alloc' (np.zeros or a shared memory Arena's alloc), and readers never block the writer
+	def __init__(self, length=con.HISTORY_LENGTH, channels=1, alloc=np.zeros):
+		self.data = alloc((length, channels))
+		self.total = alloc(1, np.int64)
+		self.lock = threading.Lock()
+		self.seqlock = SeqLock(alloc)
+
+	@property
+	def count(self):
+		return int(self.total[0])
+
+	def append(self, values):
+		with self.lock, self.seqlock.writing():
+			self.data[self.count % len(self.data)] = values[:self.data.shape[1]]
+			self.total[0] += 1
+
+	def since(self, count, limit=None):
+		# Return the current sample count and an array (oldest first) of the samples added after 'count'
+		# At most the buffer length (or 'limit') of the newest samples are returned if the reader has fallen behind
+		def read():
+			total = self.count
+			start = 0 if count > total else count
+			# Start again from 0 if the reader is ahead of this buffer (eg. after a restart)
+			n = min(total - start, len(self.data))
+			if limit is not None:
+				n = min(n, limit)
+			index = np.arange(total - n, total) % len(self.data)
+
+			return total, self.data[index]
+
+		return self.seqlock.read(read)
+
+
+class Undistorter:
+	# Removes lens distortion with cv2.remap, using lookup tables built once per (input size, output size) pair
+	# rather than rebuilt on every call as cv2.undistort does
+	# Giving an output size different to the input undistorts and rescales in the same pass
+	def __init__(self, mtx=con.MTX, dist=con.DIST):
+		self.mtx = mtx
+		self.dist = dist
+		self.maps = {}
+
+	def get_maps(self, size_in, size_out):
+		key = (size_in, size_out)
+		if key not in self.maps:
+			# Scale the camera matrix so the output covers the same field of view at its own resolution
+			scale = np.diag([float(size_out[0]) / size_in[0], float(size_out[1]) / size_in[1], 1])
+			self.maps[key] = cv2.initUndistortRectifyMap(
+				self.mtx,
+				self.dist,
+				None,
+				scale.dot(self.mtx),
+				size_out,
+				cv2.CV_16SC2
+			)
+
+		return self.maps[key]
+
+	def __call__(self, image, size=None):
+		# Sizes are (width, height) as elsewhere in OpenCV
+		size_in = (image.shape[1], image.shape[0])
+		size_out = size_in if size is None else tuple(size)
+		map_1, map_2 = self.get_maps(size_in, size_out)
+
+		return cv2.remap(image, map_1, map_2, cv2.INTER_LINEAR)
+
+
+# Shared undistortion engine using the default calibration
+undistort = Undistorter()
+
+# JPEG scale factors that OpenCV (via libjpeg) can decode to directly in the DCT domain
+JPEG_REDUCED_DECODE = [
+	(8, cv2.IMREAD_REDUCED_COLOR_8),
+	(4, cv2.IMREAD_REDUCED_COLOR_4),
+	(2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+
+def jpeg_size(data):
+	# Read (width, height) from a JPEG's start-of-frame header without decoding it
+	i = 2
+	while i + 9 < len(data) and bytearray(data[i:i + 1])[0] == 0xFF:
+		marker = bytearray(data[i + 1:i + 2])[0]
+		(length,) = struct.unpack('>H', data[i + 2:i + 4])
+		# SOF0 to SOF15, excluding the DHT, JPG and DAC markers that share the range
+		if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+			height, width = struct.unpack('>HH', data[i + 5:i + 9])
+			return width, height
+		i += 2 + length
+
+	return None
+
+
+# Sequence numbers identifying each received frame, unique across all sources
+_frame_seq = itertools.count(1)
+
+
+class FrameProducts:
+	# Images derived from one received frame, in the stages
+	# decoded -> undistorted / resized -> colour mapped -> encoded
+	# Each product is computed the first time it is asked for and memoised until the next frame replaces this one,
+	# so stages no consumer uses cost nothing
+	def __init__(self, frame, decode):
+		self.frame = frame
+		self.decode = decode
+		self.seq = next(_frame_seq)
+		self.products = {}
+		# Re-entrant as products are built from other products of the same frame
+		self.lock = threading.RLock()
+
+	def memo(self, key, compute):
+		# Concurrent consumers asking for the same product share a single computation
+		with self.lock:
+			if key not in self.products:
+				self.products[key] = compute()
+
+			return self.products[key]
+
+	def decoded(self):
+		return self.memo('decoded', lambda: self.decode(self.frame))
+
+	def jpeg(self):
+		# Original bytes of a JPEG-compressed frame (None for other formats), for forwarding without transcoding
+		data = self.frame.data
+		return data if data[:2] == b'\xff\xd8' else None
+
+	def size(self):
+		# Full image size as (width, height), taken from the JPEG header where possible to avoid a decode
+		def get_size():
+			if self.jpeg() is not None and 'decoded' not in self.products:
+				full_size = jpeg_size(self.jpeg())
+				if full_size is not None:
+					return full_size
+
+			return self.decoded().shape[1::-1]
+
+		return self.memo('size', get_size)
+
+	def decoded_for(self, size):
+		# Cheapest decode that still covers the requested size
+		# JPEGs that haven't been fully decoded yet can be decoded straight to 1/2, 1/4 or 1/8 scale
+		if 'decoded' in self.products or self.jpeg() is None:
+			return self.decoded()
+
+		full_size = self.size()
+		for factor, flag in JPEG_REDUCED_DECODE:
+			if full_size[0] // factor >= size[0] and full_size[1] // factor >= size[1]:
+				return self.memo(
+					('decoded', factor),
+					lambda: cv2.imdecode(np.frombuffer(self.jpeg(), np.uint8), flag)
+				)
+
+		return self.decoded()
+
+	def undistorted(self, size=None):
+		return self.memo(('undistorted', size), lambda: undistort(self.decoded(), size))
+
+	def resized(self, size=None, undistorted=False):
+		# Sizes are (width, height) tuples; undistorting and resizing share a single remap
+		if undistorted:
+			return self.undistorted(size)
+		if size is None:
+			return self.decoded()
+
+		return self.memo(('resized', size), lambda: cv2.resize(self.decoded_for(size), size))
+
+	def colour_mapped(self, colour_map, size=None, undistorted=False):
+		return self.memo(
+			('colour_mapped', colour_map, size, undistorted),
+			lambda: cv2.applyColorMap(self.resized(size, undistorted), colour_map)
+		)
+
+	def encoded(self, ext, size=None, undistorted=False, colour_map=None, params=()):
+		# Encoded image bytes, eg. ext='.jpg' with params=(cv2.IMWRITE_JPEG_QUALITY, 80)
+		def encode():
+			if colour_map is None:
+				image = self.resized(size, undistorted)
+			else:
+				image = self.colour_mapped(colour_map, size, undistorted)
+
+			return cv2.imencode(ext, image, params)[1].tobytes()
+
+		return self.memo(('encoded', ext, size, undistorted, colour_map, tuple(params)), encode)
+
+
+def decoded(products):
+	# Decoded image for the latest frame of a source, or None if no frame has arrived yet
+	return None if products is None else products.decoded()
+
+
+class MiRo:
+	def __init__(self, robot=None):
 		name = 'MiRo_ROS_interface'
-		# Initialise ROS node ('disable_rostime=True' needed to work in PyCharm)
-		if name not in rosnode.get_node_names():
-			rospy.init_node(name, anonymous=True, disable_rostime="PYCHARM_HOSTED" in os.environ)
-			
+		# Initialise ROS node once per process ('disable_rostime=True' needed to work in PyCharm)
+		# Checked locally rather than by asking the master for its node list
+		# Signal handlers can only be installed from the main thread, and the dashboard starts its clients in another
+		with _node_lock:
+			if not rospy.core.is_initialized():
+				rospy.init_node(
+					name,
+					anonymous=True,
+					disable_rostime="PYCHARM_HOSTED" in os.environ,
+					disable_signals=threading.current_thread() is not threading.main_thread()
+				)
+
 		# ROS topic root
-		self.tr = '/' + os.getenv('MIRO_ROBOT_NAME') + '/'
+		self.robot = robot or os.getenv('MIRO_ROBOT_NAME')
+		self.tr = '/' + self.robot + '/'
 
 		# Publisher queue size
 		self.qs = 2
 
-		# Initialisation sleep duration
-		self.sleep_time = 0.5
-
-	@staticmethod
-	def ros_sleep(time):
-		# Sleep after init to prevent accessing data before a topic is subscribed
-		rospy.sleep(time)
+		# Per-topic 'first message received' events and time taken (seconds) for each topic to go live
+		self.ready = {}
+		self.ready_time = {}
+
+		# Per-topic count of messages handled, so consumers can tell whether anything new has arrived
+		self.seq = {}
+
+		# Functions called as listener(topic, message) after each message has been handled
+		self.listeners = []
+
+		# Waiters for new messages (by topic) and new frames (by attribute name, eg. 'caml_frame')
+		self.changes = Changes()
+
+	def subscribe(self, topic, data_class, callback, **kwargs):
+		# Subscribe to a topic relative to the topic root, counting messages handled and flagging the topic as live
+		# once the first has been
+		event = threading.Event()
+		self.ready[topic] = event
+		self.seq[topic] = 0
+		subscribed = time.time()
+
+		def callback_ready(data):
+			callback(data)
+			self.seq[topic] += 1
+			for listener in self.listeners:
+				listener(topic, data)
+			self.changes.notify(topic)
+			if not event.is_set():
+				self.ready_time[topic] = time.time() - subscribed
+				event.set()
+
+		return rospy.Subscriber(self.tr + topic, data_class, callback_ready, **kwargs)
+
+	def watching(self, names):
+		# See Changes.watching()
+		return self.changes.watching(names)
+
+	def wait_until_ready(self, timeout):
+		# Wait for every subscribed topic to go live, sharing one deadline between them
+		deadline = time.time() + timeout
+		for event in self.ready.values():
+			event.wait(max(0, deadline - time.time()))
+
+		# Reported by full topic name, so topics of different robots can be told apart
+		return {self.tr + topic: self.ready_time.get(topic) for topic in self.ready}
+
+
+def core_histories(alloc=np.zeros):
+	# MiRoCore's history buffers, with arrays from 'alloc' (np.zeros or a shared memory Arena's alloc)
+	# Always allocated in this order, so processes sharing them agree on where each one is
+	return {
+		'affect_history'    : RingBuffer(length=con.AFFECT_HISTORY_LENGTH, channels=4, alloc=alloc),  # Emotion, mood (V, A)
+		'motivation_history': RingBuffer(channels=2, alloc=alloc),  # Social, ball
+		# Long histories for zoomable graphs, queried at any time range and resolution
+		'series'            : {
+			'affect'    : TimeSeries(
+				['emotion_valence', 'emotion_arousal', 'mood_valence', 'mood_arousal'],
+				con.SERIES_WIDTHS,
+				con.SERIES_CAPACITY,
+				alloc=alloc
+			),
+			'motivation': TimeSeries(['social', 'ball'], con.SERIES_WIDTHS, con.SERIES_CAPACITY, alloc=alloc),
+			'priority'  : TimeSeries([str(i) for i in range(8)], con.SERIES_WIDTHS, con.SERIES_CAPACITY, alloc=alloc),
+			'sleep'     : TimeSeries(['wakefulness', 'pressure'], con.SERIES_WIDTHS, con.SERIES_CAPACITY, alloc=alloc),
+		},
+	}
 
 
 class MiRoCore(MiRo):
-	def __init__(self):
+	def __init__(self, robot=None, histories=None):
 		# TODO: Use super() when moving to Python 3
 		# TODO: Add init test to check if demo code is running
-		MiRo.__init__(self)
+		MiRo.__init__(self, robot)
 
-		# Topic subscriptions
-		# State
-		rospy.Subscriber(self.tr + 'core/animal/state', miro.msg.animal_state, self.callback_core_state)
-		# rospy.Subscriber(topic_root + '/core/detect_objects_l', miro.msg.objects, self.callback_detect_objects_l)
-		# rospy.Subscriber(topic_root + '/core/detect_objects_r', miro.msg.objects, self.callback_detect_objects_r)
-		# rospy.Subscriber(topic_root + '/core/detect_ball_l', UInt16MultiArray, self.callback_detect_ball_l)
-		# rospy.Subscriber(topic_root + '/core/detect_ball_r', UInt16MultiArray, self.callback_detect_ball_r)
-		# rospy.Subscriber(topic_root + '/core/detect_face_l', Float32MultiArray, self.callback_detect_face_l)
-		# rospy.Subscriber(topic_root + '/core/detect_face_r', Float32MultiArray, self.callback_detect_face_r)
-		# Salience maps
-		rospy.Subscriber(self.tr + 'core/pril', Image, self.callback_pril)
-		rospy.Subscriber(self.tr + 'core/prir', Image, self.callback_prir)
-		rospy.Subscriber(self.tr + 'core/priw', Image, self.callback_priw)
-		# Selection
-		rospy.Subscriber(self.tr + 'core/selection/inhibition', Float32MultiArray, self.callback_selection_inhibition)
-		rospy.Subscriber(self.tr + 'core/selection/priority', Float32MultiArray, self.callback_selection_priority)
-		# Motivation
-		rospy.Subscriber(self.tr + 'motivation', Float32MultiArray, self.callback_motivation)
+		# History buffers may be given (see core_histories()), eg. to keep them in shared memory
+		histories = histories or core_histories()
 
 		# Default data
 		# self.core_detect_objects_l = None
@@ -76,24 +467,55 @@ class MiRoCore(MiRo):
 		# self.core_detect_face_l = None
 		# self.core_detect_face_r = None
 		self.emotion = None
+		self.affect_history = histories['affect_history']
 		self.mood = None
 		self.motivation = None
-		self.pril = None
-		self.prir = None
-		self.priw = None
+		self.motivation_history = histories['motivation_history']
+		self.pril_frame = None
+		self.prir_frame = None
+		self.priw_frame = None
+
+		# Salience map decoders
+		self.decode_pri = functools.partial(self.process_pri, height=con.PRI['height'], width=con.PRI['width'])
+		self.decode_priw = functools.partial(self.process_pri, height=con.PRIW['height'], width=con.PRIW['width'])
 		self.selection_inhibition = None
 		self.selection_priority = None
 		self.sleep = None
 		self.time = None
 		self.time_raw = None
 
-		# Sleep for ROS initialisation
-		self.ros_sleep(self.sleep_time)
+		self.series = histories['series']
+
+		# Topic subscriptions
+		# State
+		self.subscribe('core/animal/state', miro.msg.animal_state, self.callback_core_state)
+		# rospy.Subscriber(topic_root + '/core/detect_objects_l', miro.msg.objects, self.callback_detect_objects_l)
+		# rospy.Subscriber(topic_root + '/core/detect_objects_r', miro.msg.objects, self.callback_detect_objects_r)
+		# rospy.Subscriber(topic_root + '/core/detect_ball_l', UInt16MultiArray, self.callback_detect_ball_l)
+		# rospy.Subscriber(topic_root + '/core/detect_ball_r', UInt16MultiArray, self.callback_detect_ball_r)
+		# rospy.Subscriber(topic_root + '/core/detect_face_l', Float32MultiArray, self.callback_detect_face_l)
+		# rospy.Subscriber(topic_root + '/core/detect_face_r', Float32MultiArray, self.callback_detect_face_r)
+		# Salience maps
+		self.subscribe('core/pril', Image, self.callback_pril)
+		self.subscribe('core/prir', Image, self.callback_prir)
+		self.subscribe('core/priw', Image, self.callback_priw)
+		# Selection
+		self.subscribe('core/selection/inhibition', Float32MultiArray, self.callback_selection_inhibition)
+		self.subscribe('core/selection/priority', Float32MultiArray, self.callback_selection_priority)
+		# Motivation
+		self.subscribe('motivation', Float32MultiArray, self.callback_motivation)
 
 	def callback_core_state(self, data):
 		self.emotion = data.emotion
 		self.mood = data.mood
 		self.sleep = data.sleep
+		self.affect_history.append([data.emotion.valence, data.emotion.arousal, data.mood.valence, data.mood.arousal])
+		now = time.time()
+		self.series['affect'].append(
+			now,
+			[data.emotion.valence, data.emotion.arousal, data.mood.valence, data.mood.arousal]
+		)
+		self.series['sleep'].append(now, [data.sleep.wakefulness, data.sleep.pressure])
 		self.time_raw = data.time_of_day
 		timedelta = datetime.timedelta(self.time_raw)
 		try:
@@ -104,21 +526,40 @@ class MiRoCore(MiRo):
 
 	def callback_motivation(self, data):
 		self.motivation = data
+		self.motivation_history.append(data.data)
+		self.series['motivation'].append(time.time(), data.data)
 
 	def callback_pril(self, frame):
-		self.pril = self.process_pri(frame, height=con.PRI['height'], width=con.PRI['width'])
+		self.pril_frame = FrameProducts(frame, self.decode_pri)
+		self.changes.notify('pril_frame')
 
 	def callback_prir(self, frame):
-		self.prir = self.process_pri(frame, height=con.PRI['height'], width=con.PRI['width'])
+		self.prir_frame = FrameProducts(frame, self.decode_pri)
+		self.changes.notify('prir_frame')
 
 	def callback_priw(self, frame):
-		self.priw = self.process_pri(frame, height=con.PRIW['height'], width=con.PRIW['width'])
+		self.priw_frame = FrameProducts(frame, self.decode_priw)
+		self.changes.notify('priw_frame')
 
 	def callback_selection_inhibition(self, data):
 		self.selection_inhibition = data
 
 	def callback_selection_priority(self, data):
 		self.selection_priority = data
+		self.series['priority'].append(time.time(), data.data)
+
+	# Salience maps as image arrays, reshaped when first read
+	@property
+	def pril(self):
+		return decoded(self.pril_frame)
+
+	@property
+	def prir(self):
+		return decoded(self.prir_frame)
+
+	@property
+	def priw(self):
+		return decoded(self.priw_frame)
 
 	@staticmethod
 	def process_pri(frame, height, width):
@@ -130,39 +571,77 @@ class MiRoCore(MiRo):
 
 class MiRoPerception(MiRo):
 	# Asynchronous sensors
-	def __init__(self):
+	def __init__(self, robot=None):
 		# TODO: Use super() when moving to Python 3
-		MiRo.__init__(self)
+		MiRo.__init__(self, robot)
 
 		# TODO: Add test for physical or simulated robot to switch this flag
 		self.opt = {'Uncompressed': False}
 
+		# Default data
+		self.caml_frame = None
+		self.camr_frame = None
+		self.mics = None
+
+		# Decode each new frame on the worker pool as it arrives, so it is ready before anything asks for it
+		# Further products (undistorted, resized, encoded...) are only computed on demand
+		self.decode_ahead = True
+
+		# Frames are processed on the worker pool; only the newest unprocessed frame per camera is kept
+		self.mailbox_caml = FrameMailbox(self.decode_caml)
+		self.mailbox_camr = FrameMailbox(self.decode_camr)
+
 		# Topic subscriptions
+		# A queue size of one (with a buffer large enough for a whole frame) lets rospy drop stale frames too
+		cam_opt = {'queue_size': 1, 'buff_size': 2 ** 24}
 		if self.opt['Uncompressed']:
 			# TODO: Uncompressed callbacks are untested
-			rospy.Subscriber(self.tr + 'sensors/caml', Image, self.callback_caml)
-			rospy.Subscriber(self.tr + 'sensors/camr', Image, self.callback_camr)
+			self.subscribe('sensors/caml', Image, self.callback_caml, **cam_opt)
+			self.subscribe('sensors/camr', Image, self.callback_camr, **cam_opt)
 		else:
-			rospy.Subscriber(self.tr + 'sensors/caml/compressed', CompressedImage, self.callback_caml)
-			rospy.Subscriber(self.tr + 'sensors/camr/compressed', CompressedImage, self.callback_camr)
-		rospy.Subscriber(self.tr + 'sensors/mics', Int16MultiArray, self.callback_mics)
-
-		# Default data
-		self.caml = None
-		self.caml_undistorted = None
-		self.camr = None
-		self.camr_undistorted = None
-		self.mics = None
-
-		# Sleep for ROS initialisation
-		self.ros_sleep(self.sleep_time)
+			self.subscribe('sensors/caml/compressed', CompressedImage, self.callback_caml, **cam_opt)
+			self.subscribe('sensors/camr/compressed', CompressedImage, self.callback_camr, **cam_opt)
+		self.subscribe('sensors/mics', Int16MultiArray, self.callback_mics)
 
 	# TODO: Image stitching
 	def callback_caml(self, frame):
-		[self.caml, self.caml_undistorted] = self.process_frame(frame)
+		self.mailbox_caml.put(frame)
 
 	def callback_camr(self, frame):
-		[self.camr, self.camr_undistorted] = self.process_frame(frame)
+		self.mailbox_camr.put(frame)
+
+	# Camera frames are only ready once decoded, so are notified as they're set rather than with their topic
+	def decode_caml(self, frame):
+		self.caml_frame = self.prepare_frame(frame)
+		self.changes.notify('caml_frame')
+
+	def decode_camr(self, frame):
+		self.camr_frame = self.prepare_frame(frame)
+		self.changes.notify('camr_frame')
+
+	def prepare_frame(self, frame):
+		products = FrameProducts(frame, self.process_frame)
+		if self.decode_ahead:
+			products.decoded()
+
+		return products
+
+	# Camera images as arrays; undistorted images are only computed if read
+	@property
+	def caml(self):
+		return decoded(self.caml_frame)
+
+	@property
+	def camr(self):
+		return decoded(self.camr_frame)
+
+	@property
+	def caml_undistorted(self):
+		return None if self.caml_frame is None else self.caml_frame.undistorted()
+
+	@property
+	def camr_undistorted(self):
+		return None if self.camr_frame is None else self.camr_frame.undistorted()
 
 	def callback_mics(self, msg):
 		# Rescale data to be between -1 and +1
@@ -184,19 +663,15 @@ class MiRoPerception(MiRo):
 		frame_array = np.frombuffer(frame.data, np.uint8)
 		image_array = cv2.imdecode(frame_array, cv2.IMREAD_UNCHANGED)
 		# image_array = cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB)
-		image_undistorted = cv2.undistort(image_array, con.MTX, con.DIST, None)
 
-		return image_array, image_undistorted
+		return image_array
 
 
 class MiRoSensors(MiRo):
 	# Synchronous 50Hz sensors
-	def __init__(self):
+	def __init__(self, robot=None):
 		# TODO: Use super() when moving to Python 3
-		MiRo.__init__(self)
-
-		# Topic subscriptions
-		rospy.Subscriber(self.tr + 'sensors/package', msg.sensors_package, self.callback_sensors)
+		MiRo.__init__(self, robot)
 
 		# Initialise data
 		self.sensors = None
@@ -205,8 +680,8 @@ class MiRoSensors(MiRo):
 		self.cliff = None
 		self.sonar = None
 
-		# Sleep for ROS initialisation
-		self.ros_sleep(self.sleep_time)
+		# Topic subscriptions
+		self.subscribe('sensors/package', msg.sensors_package, self.callback_sensors)
 
 	def callback_sensors(self, sensors):
 		self.sensors = sensors
@@ -244,9 +719,9 @@ class MiRoSensors(MiRo):
 
 
 class MiRoPublishers(MiRo):
-	def __init__(self):
+	def __init__(self, robot=None):
 		# TODO: Use super() when moving to Python 3
-		MiRo.__init__(self)
+		MiRo.__init__(self, robot)
 
 		# Topics
 		self.cmd_vel = rospy.Publisher(self.tr + 'control/cmd_vel', TwistStamped, queue_size=self.qs)
@@ -262,8 +737,14 @@ class MiRoPublishers(MiRo):
 		self.illum_msg = UInt32MultiArray()
 		self.tone_msg = UInt16MultiArray()
 
-		# Sleep for ROS initialisation
-		self.ros_sleep(self.sleep_time)
+		# Wait for subscribers so that the first published messages aren't lost
+		self.wait_for_subscribers(timeout=1.0)
+
+	def wait_for_subscribers(self, timeout):
+		publishers = [self.cmd_vel, self.kinematic_joints, self.cosmetic_joints, self.illum, self.tone]
+		deadline = time.time() + timeout
+		while time.time() < deadline and not all(p.get_num_connections() for p in publishers):
+			time.sleep(0.01)
 
 	# Publish wheel speeds (m/s)
 	def pub_cmd_vel_ms(self, left=0, right=0):
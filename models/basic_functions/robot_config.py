@@ -0,0 +1,12 @@
+# Other packages
+import os
+
+
+def robot_names():
+	# Robots to watch: a comma-separated 'MIRO_ROBOT_NAMES' list, or the single 'MIRO_ROBOT_NAME' set up by the MDK
+	# Kept apart from the ROS interface so that the dashboard can read it without importing ROS
+	names = os.getenv('MIRO_ROBOT_NAMES')
+	if names:
+		return [name.strip() for name in names.split(',') if name.strip()]
+
+	return [os.getenv('MIRO_ROBOT_NAME')]
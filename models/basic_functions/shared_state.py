@@ -0,0 +1,215 @@
+# Other packages
+# Shared memory itself is only imported by Arena: the rest of this module (SeqLock, Slot) also serves plain
+# in-process data, which is all the dashboard uses without the telemetry bus
+import contextlib
+import numpy as np
+import secrets
+import time
+import weakref
+
+# Optional atomic operations on shared memory, for SeqLock; see there for what happens without them
+try:
+	import atomics
+except ImportError:
+	atomics = None
+
+# Byte alignment of arrays in an Arena
+ALIGN = 8
+
+
+def aligned(nbytes):
+	return -(-nbytes // ALIGN) * ALIGN
+
+
+def measure(build):
+	# Bytes an Arena needs to hold the arrays that 'build(alloc)' allocates
+	sizes = []
+
+	def alloc(shape, dtype=float):
+		array = np.zeros(shape, dtype)
+		sizes.append(aligned(array.nbytes))
+		return array
+
+	build(alloc)
+
+	return sum(sizes)
+
+
+class Arena:
+	# Named block of shared memory carved up into numpy arrays
+	# The writing process creates it (sized with measure()) and readers attach to it by name; both make the same
+	# allocations in the same order, so each gets views of the same arrays without copying anything
+	# The block is unlinked when the writer exits, or replaced if a writer left it behind
+	# Each block starts with a random generation number, so readers can tell when a restarted writer has replaced it
+	def __init__(self, name, size=None):
+		from multiprocessing import resource_tracker, shared_memory
+		if size is None:
+			self.shm = shared_memory.SharedMemory(name)
+			# Otherwise Python unlinks the block when any reader exits (fixed in Python 3.13)
+			resource_tracker.unregister(self.shm._name, 'shared_memory')
+		else:
+			unlink_stale(name)
+			# New blocks are zero-filled
+			self.shm = shared_memory.SharedMemory(name, create=True, size=size + ALIGN)
+		self.name = name
+		self.offset = 0
+		self.header = self.alloc(1, np.uint64)
+		if size is not None:
+			self.header[0] = secrets.randbits(64)
+
+	def generation(self):
+		return int(self.header[0])
+
+	def replaced(self):
+		# Block now found under this arena's name if a writer has replaced it since, otherwise None
+		try:
+			current = Arena(self.name)
+		except FileNotFoundError:
+			return None
+
+		return current if current.generation() != self.generation() else None
+
+	def alloc(self, shape, dtype=float):
+		# Same signature as np.zeros, so anything taking an allocator can be given either
+		array = np.ndarray(shape, dtype, buffer=self.shm.buf, offset=self.offset)
+		self.offset += aligned(array.nbytes)
+
+		return array
+
+	def unlink(self):
+		# Remove the block once its writer is done; readers already attached keep their mapping
+		self.shm.unlink()
+
+
+def unlink_stale(name):
+	# Remove a block left behind by a process that didn't exit cleanly
+	from multiprocessing import shared_memory
+	try:
+		stale = shared_memory.SharedMemory(name)
+	except FileNotFoundError:
+		return
+	stale.unlink()
+	stale.close()
+
+
+class SeqLock:
+	# Version counter guarding data that one writer updates while any number of readers, in any process, read it
+	# The version is odd while a write is in progress; readers never block the writer, and retry if the version was odd
+	# or changed while they read
+	# This only works if other processes see the counter change before the data written after it (and after the data
+	# written before it), which plain stores don't promise on ARM. With the 'atomics' package the counter is read and
+	# written with sequentially consistent atomic operations instead, which GCC brackets with full memory barriers on
+	# 32-bit ARM (as on the Raspberry Pi's OS); x86 keeps stores in order anyway
+	# Without it, plain stores are used, which is fine within one process; run this file to check a machine for torn
+	# reads between processes
+	def __init__(self, alloc=np.zeros):
+		# 32 bits, as 64-bit stores aren't atomic on the Raspberry Pi's 32-bit OS
+		self.counter = alloc(1, np.uint32)
+		if atomics is not None:
+			# The view is held open for as long as the lock exists
+			context = atomics.atomicview(buffer=self.counter.data.cast('B'), atype=atomics.UINT)
+			view = context.__enter__()
+			weakref.finalize(self, context.__exit__, None, None, None)
+			self.load = view.load
+			self.increment = view.inc
+		else:
+			self.load = lambda: int(self.counter[0])
+			self.increment = self.increment_plain
+
+	def increment_plain(self):
+		self.counter[0] += 1
+
+	def version(self):
+		# Number of completed writes (ignoring wrap-around); cheap enough to poll for changes
+		return self.load() // 2
+
+	@contextlib.contextmanager
+	def writing(self):
+		self.increment()
+		try:
+			yield
+		finally:
+			self.increment()
+
+	def read(self, read):
+		# Result of read() taken from a consistent state of the data
+		# read() must copy what it returns, as the data may be overwritten as soon as it has returned
+		while True:
+			before = self.load()
+			if not before & 1:
+				try:
+					result = read()
+				except Exception:
+					# A torn read can fail in any number of ways; only report errors from a consistent one
+					if self.load() == before:
+						raise
+				else:
+					if self.load() == before:
+						return result
+			time.sleep(0)
+
+
+class Slot:
+	# Latest value of a variable-length byte string (eg. a camera frame) for one writer and many readers
+	def __init__(self, capacity, alloc=np.zeros):
+		self.seqlock = SeqLock(alloc)
+		self.length = alloc(1, np.uint32)
+		self.data = alloc(capacity, np.uint8)
+		self.dropped = 0
+
+	def version(self):
+		return self.seqlock.version()
+
+	def write(self, data):
+		# Values too big for the slot are dropped rather than truncated
+		if len(data) > len(self.data):
+			self.dropped += 1
+			return
+
+		with self.seqlock.writing():
+			self.data[:len(data)] = np.frombuffer(data, np.uint8)
+			self.length[0] = len(data)
+
+	def read(self):
+		return self.seqlock.read(lambda: self.data[:int(self.length[0])].tobytes())
+
+
+def check_writer(name, seconds, ready):
+	arena = Arena(name, measure(lambda alloc: Slot(CHECK_SIZE, alloc)))
+	slot = Slot(CHECK_SIZE, arena.alloc)
+	ready.set()
+	deadline = time.time() + seconds
+	value = 0
+	while time.time() < deadline:
+		value = (value + 1) % 256
+		slot.write(bytes([value]) * CHECK_SIZE)
+	arena.unlink()
+
+
+def check(seconds=10):
+	# Count torn reads of a Slot written by another process: each value written is a run of identical bytes, so any
+	# mix of bytes is a read the SeqLock let through mid-write
+	name = 'miro_dashboard_check'
+	import multiprocessing
+	ready = multiprocessing.Event()
+	writer = multiprocessing.Process(target=check_writer, args=(name, seconds, ready))
+	writer.start()
+	ready.wait()
+	arena = Arena(name)
+	slot = Slot(CHECK_SIZE, arena.alloc)
+
+	reads = torn = 0
+	while writer.is_alive():
+		data = slot.read()
+		reads += 1
+		if data and data.count(data[0]) != len(data):
+			torn += 1
+
+	print('{} reads, {} torn ({} atomic counter)'.format(reads, torn, 'with' if atomics is not None else 'without'))
+
+
+# Bytes per value written by check()
+CHECK_SIZE = 4096
+
+if __name__ == '__main__':
+	check()
@@ -0,0 +1,328 @@
+# MiRo-E modules and parameters
+try:
+	from . import miro_constants as con
+	from . import miro_ros_interface as mri
+	from .shared_state import Arena, Slot, measure
+except ImportError:
+	import miro_constants as con
+	import miro_ros_interface as mri
+	from shared_state import Arena, Slot, measure
+
+# Other packages
+import collections
+import functools
+import pickle
+import rospy
+import threading
+import time
+import types
+
+# Telemetry bus: one ingest process subscribes to the robots' topics and publishes the latest state, frames and
+# histories of each robot into shared memory, where any number of web worker processes read them
+# Writers never wait for readers; readers only copy what has changed since they last looked
+
+# Shared frames, and the topics carrying each of them
+FRAMES = ['pril', 'prir', 'priw', 'caml', 'camr']
+FRAME_TOPICS = {
+	'core/pril'              : 'pril',
+	'core/prir'              : 'prir',
+	'core/priw'              : 'priw',
+	'sensors/caml'           : 'caml',
+	'sensors/caml/compressed': 'caml',
+	'sensors/camr'           : 'camr',
+	'sensors/camr/compressed': 'camr',
+}
+
+# MiRoCore attributes shared as a single snapshot, along with the per-topic message counts ('seq')
+CORE_STATE = ['emotion', 'mood', 'sleep', 'selection_inhibition', 'selection_priority', 'time', 'time_raw']
+
+
+def bus_name(robot):
+	return con.BUS_NAME + '_' + robot
+
+
+def bus_layout(alloc):
+	# Everything shared for one robot, always allocated in this order so the ingest process and readers agree on
+	# where each part is
+	return {
+		'state'    : Slot(con.BUS_STATE_SIZE, alloc),
+		'frames'   : {source: Slot(con.BUS_FRAME_SIZE, alloc) for source in FRAMES},
+		'histories': mri.core_histories(alloc),
+	}
+
+
+class Publisher:
+	# Ingest side of one robot's bus
+	# The robot's interface clients keep their histories in shared memory, and each message handled is copied into
+	# its slot straight away on the topic's own callback thread
+	def __init__(self, robot):
+		self.arena = Arena(bus_name(robot), measure(bus_layout))
+		self.bus = bus_layout(self.arena.alloc)
+		self.state_lock = threading.Lock()
+		# Readers may attach as soon as the block exists, well before ROS is up, so give them a snapshot straight away
+		self.bus['state'].write(pickle.dumps(EMPTY_STATE, pickle.HIGHEST_PROTOCOL))
+
+		self.core = mri.get_client(mri.MiRoCore, robot, histories=self.bus['histories'])
+		self.perception = mri.get_client(mri.MiRoPerception, robot)
+		# Frames are only decoded by the web workers that need them
+		self.perception.decode_ahead = False
+
+		self.publish_state()
+		self.core.listeners.append(self.publish)
+		self.perception.listeners.append(self.publish)
+
+	def publish(self, topic, message):
+		if topic in FRAME_TOPICS:
+			self.bus['frames'][FRAME_TOPICS[topic]].write(message.data)
+		elif topic in self.core.seq:
+			self.publish_state()
+
+	def publish_state(self):
+		# Core topics have their own callback threads, but a slot takes one writer at a time
+		state = {name: getattr(self.core, name) for name in CORE_STATE}
+		state['seq'] = dict(self.core.seq)
+		with self.state_lock:
+			self.bus['state'].write(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+
+def run_ingest(robots=None):
+	# Entry point of the ingest process: publish every robot's topics until ROS shuts down
+	publishers = [Publisher(robot) for robot in robots or mri.robot_names()]
+	mri.print_startup_report(mri.start_clients([mri.MiRoCore, mri.MiRoPerception], timeout=10, robots=robots))
+
+	try:
+		while not rospy.is_shutdown():
+			time.sleep(1)
+	finally:
+		for publisher in publishers:
+			publisher.arena.unlink()
+
+
+class Reader:
+	# Web worker side of one robot's bus, attached on first use
+	def __init__(self, robot):
+		self.robot = robot
+		# The arena must outlive every array view of it, including those of arenas since replaced
+		self.arena = None
+		self.retired = []
+		self.bus = None
+		# Times attached, so clients can tell versions of a replaced bus from the current one's
+		self.attached = 0
+		self.attempted = 0
+		self.lock = threading.Lock()
+
+	def get(self):
+		# The robot's shared memory, or None while its ingest process hasn't started
+		# A restarted ingest process creates a new block, which is attached in place of the old one
+		with self.lock:
+			if time.time() - self.attempted > con.BUS_RETRY:
+				self.attempted = time.time()
+				if self.bus is None:
+					try:
+						self.attach(Arena(bus_name(self.robot)))
+					except FileNotFoundError:
+						pass
+				else:
+					arena = self.arena.replaced()
+					if arena is not None:
+						self.retired.append(self.arena)
+						self.attach(arena)
+
+			return self.bus
+
+	def attach(self, arena):
+		self.arena = arena
+		self.bus = bus_layout(arena.alloc)
+		self.attached += 1
+
+
+class Shared:
+	# Attribute of a bus client read from shared memory
+	def __set_name__(self, owner, name):
+		self.name = name
+
+
+class State(Shared):
+	def __get__(self, client, owner):
+		return client.state()[self.name]
+
+
+class History(Shared):
+	def __get__(self, client, owner):
+		return client.histories()[self.name]
+
+
+class Frame(Shared):
+	def __init__(self, source, decode):
+		self.source = source
+		self.decode = decode
+
+	def __get__(self, client, owner):
+		return client.frame(self.source, self.decode)
+
+
+class BusClient:
+	# Read-only stand-in for a MiRo interface client in a web worker, with the same attributes as far as the
+	# dashboard uses them
+	def __init__(self, robot):
+		self.robot = robot
+		self.reader = get_reader(robot)
+		self.lock = threading.Lock()
+		self.state_version = None
+		self.latest_state = None
+		self.frame_versions = {}
+		self.frames = {}
+		self.empty_histories = None
+		self.changes = mri.Changes()
+		self.poller = None
+
+	def state(self):
+		# Latest snapshot, unpickled again only when the ingest process has written a new one
+		bus = self.reader.get()
+		if bus is None:
+			return EMPTY_STATE
+
+		slot = bus['state']
+		version = (self.reader.attached, slot.version())
+		if not version[1]:
+			# Attached before the ingest process's first snapshot
+			return EMPTY_STATE
+
+		with self.lock:
+			if version != self.state_version:
+				self.latest_state = pickle.loads(slot.read())
+				# Only once unpickled, so a failed read is tried again next time
+				self.state_version = version
+
+			return self.latest_state
+
+	def watching(self, names):
+		# As the interface clients' watching(), though changes can't be signalled from another process: instead one
+		# thread per client (rather than every stream) looks for them, and wakes whoever is waiting
+		with self.lock:
+			if self.poller is None or not self.poller.is_alive():
+				self.poller = threading.Thread(target=self.poll, daemon=True)
+				self.poller.start()
+
+		return self.changes.watching(names)
+
+	def poll(self):
+		# Notify new frames by attribute name and new messages by topic, as the interface clients do
+		frames = [shared for shared in vars(type(self)).values() if isinstance(shared, Frame)]
+		has_state = any(isinstance(shared, State) for shared in vars(type(self)).values())
+		frame_versions = {}
+		seq = {}
+		while True:
+			time.sleep(con.BUS_POLL)
+			# Every stream in the worker relies on this thread, so one bad read mustn't end it
+			try:
+				bus = self.reader.get()
+				if bus is None:
+					continue
+
+				for frame in frames:
+					version = (self.reader.attached, bus['frames'][frame.source].version())
+					if version != frame_versions.get(frame.source):
+						frame_versions[frame.source] = version
+						self.changes.notify(frame.name)
+
+				if has_state:
+					for topic, count in self.state()['seq'].items():
+						if count != seq.get(topic):
+							seq[topic] = count
+							self.changes.notify(topic)
+			except Exception as e:
+				print('Telemetry bus poll failed: {}'.format(e))
+
+	def histories(self):
+		bus = self.reader.get()
+		if bus is not None:
+			return bus['histories']
+
+		# Empty histories stand in until the ingest process is up
+		with self.lock:
+			if self.empty_histories is None:
+				self.empty_histories = mri.core_histories()
+
+			return self.empty_histories
+
+	def frame(self, source, decode):
+		# Latest frame, copied out of its slot once per new frame and shared by all readers in this worker
+		# Derived images are computed on demand in the worker, as by the interface clients themselves
+		bus = self.reader.get()
+		if bus is None:
+			return None
+
+		slot = bus['frames'][source]
+		version = (self.reader.attached, slot.version())
+		if not version[1]:
+			return None
+
+		with self.lock:
+			if version != self.frame_versions.get(source):
+				self.frame_versions[source] = version
+				self.frames[source] = mri.FrameProducts(types.SimpleNamespace(data=slot.read()), decode)
+
+			return self.frames[source]
+
+
+# Salience map decoders, as MiRoCore's
+decode_pri = functools.partial(mri.MiRoCore.process_pri, height=con.PRI['height'], width=con.PRI['width'])
+decode_priw = functools.partial(mri.MiRoCore.process_pri, height=con.PRIW['height'], width=con.PRIW['width'])
+
+# Before the ingest process's first snapshot, as MiRoCore's defaults
+EMPTY_STATE = dict({name: None for name in CORE_STATE}, seq=collections.defaultdict(int))
+
+
+class SharedCore(BusClient):
+	emotion = State()
+	mood = State()
+	sleep = State()
+	selection_inhibition = State()
+	selection_priority = State()
+	time = State()
+	time_raw = State()
+	seq = State()
+	affect_history = History()
+	motivation_history = History()
+	series = History()
+	pril_frame = Frame('pril', decode_pri)
+	prir_frame = Frame('prir', decode_pri)
+	priw_frame = Frame('priw', decode_priw)
+
+
+class SharedPerception(BusClient):
+	caml_frame = Frame('caml', mri.MiRoPerception.process_frame)
+	camr_frame = Frame('camr', mri.MiRoPerception.process_frame)
+
+	# Frames are decoded when first read in each worker, whatever this is set to
+	decode_ahead = False
+
+
+# Process-wide readers and bus clients, one per robot (and class)
+_readers = {}
+_readers_lock = threading.Lock()
+_bus_clients = {}
+_bus_clients_lock = threading.Lock()
+
+
+def get_reader(robot):
+	with _readers_lock:
+		if robot not in _readers:
+			_readers[robot] = Reader(robot)
+
+		return _readers[robot]
+
+
+def get_bus_client(cls, robot):
+	# Shared instance of a bus client class for one robot, as get_client() for the interface classes
+	with _bus_clients_lock:
+		if (cls, robot) not in _bus_clients:
+			_bus_clients[(cls, robot)] = cls(robot)
+
+		return _bus_clients[(cls, robot)]
+
+
+if __name__ == '__main__':
+	# Run on its own, so web workers started separately (and any number of them) can read the bus
+	run_ingest()
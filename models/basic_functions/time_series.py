@@ -0,0 +1,229 @@
+# MiRo-E modules
+try:
+	from .shared_state import SeqLock
+except ImportError:
+	from shared_state import SeqLock
+
+# Other packages
+import numpy as np
+import threading
+
+# Ways query() can reduce a range of history to the points drawn
+METHODS = ['minmax', 'mean', 'lttb']
+
+
+class Scalar:
+	# Attribute kept in its object's 'state' array, so that whole objects can live in shared memory
+	def __init__(self, index, kind=float):
+		self.index = index
+		self.kind = kind
+
+	def __get__(self, instance, owner):
+		return self.kind(instance.state[self.index])
+
+	def __set__(self, instance, value):
+		instance.state[self.index] = value
+
+
+class Level:
+	# Ring of time buckets holding the count, minimum, maximum and mean of each channel
+	# Bucket width 0 stores raw samples (one per bucket)
+	# Total buckets ever closed; the oldest one still held is at max(0, count - capacity)
+	count = Scalar(0, int)
+	# Bucket still being filled, if open_n isn't 0
+	open_index = Scalar(1)
+	open_t = Scalar(2)
+	open_n = Scalar(3, int)
+
+	def __init__(self, width, capacity, channels, alloc=np.zeros):
+		# Arrays come from 'alloc' (np.zeros or a shared memory Arena's alloc)
+		self.width = width
+		self.capacity = capacity
+		self.t = alloc(capacity)
+		self.n = alloc(capacity)
+		self.lo = alloc((capacity, channels))
+		self.hi = alloc((capacity, channels))
+		self.mean = alloc((capacity, channels))
+		self.state = alloc(4)
+		self.open_lo = alloc(channels)
+		self.open_hi = alloc(channels)
+		self.open_sum = alloc(channels)
+
+	def push(self, t, n, lo, hi, mean):
+		i = self.count % self.capacity
+		self.t[i] = t
+		self.n[i] = n
+		self.lo[i] = lo
+		self.hi[i] = hi
+		self.mean[i] = mean
+		self.count += 1
+
+	def add(self, t, values):
+		if not self.width:
+			self.push(t, 1, values, values, values)
+			return
+
+		index = t // self.width
+		if not self.open_n or index != self.open_index:
+			self.close()
+			self.open_index = index
+			self.open_t = index * self.width
+			self.open_n = 1
+			self.open_lo[:] = values
+			self.open_hi[:] = values
+			self.open_sum[:] = values
+		else:
+			self.open_n += 1
+			np.minimum(self.open_lo, values, out=self.open_lo)
+			np.maximum(self.open_hi, values, out=self.open_hi)
+			self.open_sum += values
+
+	def close(self):
+		if self.open_n:
+			self.push(self.open_t, self.open_n, self.open_lo, self.open_hi, self.open_sum / self.open_n)
+			self.open_n = 0
+
+	def first(self):
+		return max(0, self.count - self.capacity)
+
+	def time_at(self, i):
+		# Time of the bucket at running index i
+		return self.t[i % self.capacity]
+
+	def find(self, t):
+		# Running index of the first held bucket at or after time t, by binary search over the ring
+		lo, hi = self.first(), self.count
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if self.time_at(mid) < t:
+				lo = mid + 1
+			else:
+				hi = mid
+
+		return lo
+
+	def covers(self, t):
+		# Whether this level still holds everything from time t onwards
+		return self.first() == 0 or self.time_at(self.first()) <= t
+
+	def select(self, start, end):
+		# Buckets between start and end, oldest first, plus the open bucket if it's in range
+		i0 = self.find(start)
+		i1 = self.find(end)
+		index = np.arange(i0, i1) % self.capacity
+		t, n, lo, hi, mean = self.t[index], self.n[index], self.lo[index], self.hi[index], self.mean[index]
+
+		if self.open_n and start <= self.open_t < end:
+			t = np.append(t, self.open_t)
+			n = np.append(n, self.open_n)
+			lo = np.vstack([lo, self.open_lo])
+			hi = np.vstack([hi, self.open_hi])
+			mean = np.vstack([mean, self.open_sum / self.open_n])
+
+		return t, n, lo, hi, mean
+
+
+def lttb(x, y, threshold):
+	# Largest-Triangle-Three-Buckets downsampling of one series to 'threshold' points
+	# Keeps the points that best preserve the visual shape of the line; runs in time proportional to len(x)
+	if threshold >= len(x) or threshold < 3:
+		return x, y
+
+	edges = np.linspace(1, len(x) - 1, threshold - 1).astype(int)
+	keep = [0]
+	a = 0
+	for b in range(threshold - 2):
+		start, end = edges[b], edges[b + 1]
+		# Average of the next bucket (or the last point) is the third corner of the triangle
+		if b + 2 < len(edges):
+			next_x = x[edges[b + 1]:edges[b + 2]].mean()
+			next_y = y[edges[b + 1]:edges[b + 2]].mean()
+		else:
+			next_x, next_y = x[-1], y[-1]
+		area = np.abs(
+			(x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+		)
+		a = start + int(np.argmax(area))
+		keep.append(a)
+	keep.append(len(x) - 1)
+
+	return x[keep], y[keep]
+
+
+class TimeSeries:
+	# Multi-resolution history of a set of channels
+	# Samples go into a raw ring and a pyramid of coarser levels, each keeping min / max / mean per bucket, so a query
+	# reads only about as many buckets as it has pixels to fill however long the time range
+	# Queries don't block appends, so readers in other processes can share a series kept in shared memory
+	def __init__(self, channels, widths, capacity, oversample=4, alloc=np.zeros):
+		self.channels = list(channels)
+		self.levels = [Level(width, capacity, len(self.channels), alloc) for width in [0] + list(widths)]
+		self.oversample = oversample
+		self.lock = threading.Lock()
+		self.seqlock = SeqLock(alloc)
+
+	def append(self, t, values):
+		values = np.asarray(values[:len(self.channels)], dtype=float)
+		with self.lock, self.seqlock.writing():
+			for level in self.levels:
+				level.add(t, values)
+
+	def choose_level(self, start, end, pixels):
+		# Finest level holding the whole range in no more than 'oversample' buckets per pixel
+		# Bucket counts come from binary searches, so choosing costs nothing like reading the buckets
+		for level in self.levels:
+			if level.covers(start) and level.find(end) - level.find(start) <= pixels * self.oversample:
+				return level
+
+		return self.levels[-1]
+
+	def query(self, start, end, pixels, method='minmax'):
+		# Reduce the history between start and end (seconds, same clock as append()) to about 'pixels' points
+		# 'mean' gives the per-bin mean of every channel, and 'minmax' its min and max as well (for drawing the spread of
+		# each bin); 'lttb' gives each channel's own shape-preserving subset of the bucket means
+		if pixels < 1:
+			raise ValueError('Need at least one pixel, not {}'.format(pixels))
+		if method not in METHODS:
+			raise ValueError('Unknown method {}'.format(method))
+
+		def select():
+			level = self.choose_level(start, end, pixels)
+			return level, level.select(start, end)
+
+		level, (t, n, lo, hi, mean) = self.seqlock.read(select)
+
+		result = {
+			'channels': self.channels,
+			'level'   : level.width,
+			'method'  : method,
+		}
+
+		if method == 'lttb':
+			result['series'] = {}
+			for c, name in enumerate(self.channels):
+				x, y = lttb(t, mean[:, c], pixels)
+				result['series'][name] = {'t': x, 'y': y}
+
+			return result
+
+		if len(t) > pixels:
+			# Merge neighbouring buckets into one bin per pixel
+			edges = np.linspace(0, len(t), pixels + 1).astype(int)[:-1]
+			weight = np.add.reduceat(n, edges)
+			mean = np.add.reduceat(mean * n[:, None], edges) / weight[:, None]
+			if method == 'minmax':
+				lo = np.minimum.reduceat(lo, edges)
+				hi = np.maximum.reduceat(hi, edges)
+			t = t[edges]
+
+		result.update({
+			't'   : t,
+			'mean': mean,
+		})
+		if method == 'minmax':
+			result.update({
+				'min': lo,
+				'max': hi,
+			})
+
+		return result
@@ -1,23 +1,121 @@
 # Plotly Dash modules
-from dash.dependencies import Input, Output, State
-import plotly.graph_objs as go
+from dash import no_update
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from dash.exceptions import PreventUpdate
 
 # MiRo dashboard modules
 from app import app
 import dashboard_constants as con
-from views.faces import affect_faces, sleep_faces
 from views.layouts import dashboard_layouts
-
-# MiRo interface modules
-from models.basic_functions import miro_ros_interface as mri
+from models.encoding import typed_array
+from models.render_cache import render_cache
+from models.robots import get_core, get_page_robot
 
 # Other modules
+import functools
 import numpy as np
 
-# Initialise MiRo clients
-miro_core = mri.MiRoCore()
+
+def render_action(miro_core):
+	if (miro_core.selection_priority is not None) and (miro_core.selection_inhibition is not None):
+		action_inhibition = list(miro_core.selection_inhibition.data)
+		# Priority is made negative so it appears to the left of the bar chart
+		action_priority = [-x for x in miro_core.selection_priority.data]
+	else:
+		action_inhibition = [0] * len(dashboard_layouts['action_list'])
+		action_priority = [0] * len(dashboard_layouts['action_list'])
+
+	# Replace both bars' lengths in place; 'maxPoints' drops the previous values
+	action_update = [
+		{'x': [typed_array(action_priority), typed_array(action_inhibition)]},
+		[0, 1],
+		len(dashboard_layouts['action_list'])
+	]
+
+	return {
+		'action-graph'      : action_update,
+		'action-graph-large': action_update,
+	}
+
+
+def render_affect(miro_core):
+	if miro_core.emotion is None:
+		return None
+
+	emotion = [round(miro_core.emotion.valence, 3), round(miro_core.emotion.arousal, 3)]
+	mood = [round(miro_core.mood.valence, 3), round(miro_core.mood.arousal, 3)]
+	sleep = [round(miro_core.sleep.wakefulness, 3), round(miro_core.sleep.pressure, 3)]
+
+	# Points only; faces are chosen in the browser from these (see assets/clientside.js)
+	return {
+		'affect-graph'      : [
+			{
+				'x': [[emotion[0]], [mood[0]], [sleep[0]]],
+				'y': [[emotion[1]], [mood[1]], [sleep[1]]]
+			},
+			[0, 1, 2],
+			1
+		],
+		'affect-graph-large': [
+			{
+				'x': [[emotion[0]], [mood[0]]],
+				'y': [[emotion[1]], [mood[1]]]
+			},
+			[0, 1],
+			1
+		],
+	}
+
+
+def render_sleep(miro_core):
+	if miro_core.sleep is None:
+		return None
+
+	return {
+		'sleep-graph-large': [
+			{
+				'x': [[round(miro_core.sleep.wakefulness, 3)]],
+				'y': [[round(miro_core.sleep.pressure, 3)]]
+			},
+			[0],
+			1
+		],
+	}
 
 
+def send_new(name, version, render, graphs, seen):
+	# Return the update for each graph in 'graphs' (True if visible) that hasn't been sent this version yet, and the
+	# client's new record of versions seen
+	# Updates are rendered once per version for all clients watching the same robot; if no graph needs anything the
+	# callback is cancelled so nothing at all is sent
+	# Graphs in a closed modal are unmounted, so their record is dropped and they're sent the latest data once reopened
+	seen = dict(seen or {})
+	hidden = [graph for graph, visible in graphs if not visible and graph in seen]
+	for graph in hidden:
+		del seen[graph]
+
+	stale = [visible and seen.get(graph) != version for graph, visible in graphs]
+	updates = render_cache.get(name, version, render) if any(stale) else None
+	if updates is None:
+		if not hidden:
+			raise PreventUpdate
+		return [no_update] * len(graphs) + [seen]
+
+	output = []
+	for (graph, _), send in zip(graphs, stale):
+		if send:
+			output.append(updates[graph])
+			seen[graph] = version
+		else:
+			output.append(no_update)
+
+	return output + [seen]
+
+
+# Each display has its own callback, so a slow one doesn't hold up the others
+# Graphs are given their layouts once with the page and only receive new data through 'extendData'
+# Modal states are inputs so that opening a modal brings its graphs up to date straight away
+
 @app.callback(
 	[
 		# FIXME: Update alert code in MRI
@@ -25,23 +123,18 @@ miro_core = mri.MiRoCore()
 		# Output('ball-alert-large', 'is_open'),
 		# Output('face-alert', 'is_open'),
 		# Output('face-alert-large', 'is_open'),
-		Output('action-graph', 'figure'),
-		Output('action-graph-large', 'figure'),
-		Output('affect-graph', 'figure'),
-		Output('affect-graph-large', 'figure'),
-		Output('sleep-graph-large', 'figure'),
-		Output('motivation-graph', 'figure'),
-		Output('motivation-graph-large', 'figure'),
-		Output('motivation_memory', 'data')
+		Output('action-graph-packed', 'data'),
+		Output('action-graph-large-packed', 'data'),
+		Output('action-seq', 'data')
 	],
-	[Input('interval-fast', 'n_intervals')],
-	[State('motivation_memory', 'data')]
+	[Input('interval-fast', 'n_intervals'), Input('action-modal', 'is_open')],
+	[State('action-seq', 'data'), State('url', 'search')]
 )
-def callback_fast(_, data):
-	# Initialise output data dictionary
-	output = {}
+def callback_action(_, action_open, seen, search):
+	robot = get_page_robot(search)
+	miro_core = get_core(robot)
 
-	# FIXME: Update or remove ball and face alerts
+	# FIXME: Update or remove ball and face alerts (and add them to the outputs above)
 	# # Ball alert
 	# if (miro_ros_data.core_detect_ball_l is not None) and (miro_ros_data.core_detect_ball_r is not None):
 	# 	if (len(miro_ros_data.core_detect_ball_l.data) > 1) or (len(miro_ros_data.core_detect_ball_r.data) > 1):
@@ -60,244 +153,138 @@ def callback_fast(_, data):
 	# 		output['face-alert'] = False
 	# 		output['face-alert-large'] = False
 
-	# Action selection
-	if (miro_core.selection_priority is not None) and (miro_core.selection_inhibition is not None):
-		action_inhibition = np.array(miro_core.selection_inhibition.data)
-		# Priority is made negative so it appears to the left of the bar chart
-		action_priority = np.array([-x for x in miro_core.selection_priority.data])
-	else:
-		action_inhibition = [0]
-		action_priority = [0]
-
-	action_data = [
-		go.Bar(
-			hoverinfo='text+y',
-			# Format input label to three decimal places
-			# hovertext=np.round(-action_priority, decimals=3),
-			marker={'color': '#F39C12'},  # Match header colour
-			name='Input',
-			orientation='h',
-			x=action_priority,
-			y=dashboard_layouts['action_list']
-		),
-		go.Bar(
-			hoverinfo='none',
-			marker={'color': '#95a5a6'},  # Match Flatly theme grey
-			name='Output',
-			orientation='h',
-			x=action_inhibition,
-			y=dashboard_layouts['action_list'],
-		)
-	]
+	# Either topic arriving gives a new version
+	version = miro_core.seq['core/selection/priority'] + miro_core.seq['core/selection/inhibition']
 
-	output['action-graph'] = {
-		'data'  : action_data,
-		'layout': dashboard_layouts['action_layout']
-	}
-	output['action-graph-large'] = {
-		'data'  : action_data,
-		'layout': dashboard_layouts['action_layout']
-	}
+	return send_new(robot + '/action', version, functools.partial(render_action, miro_core), [
+		('action-graph', True),
+		('action-graph-large', action_open),
+	], seen)
 
-	# Affect
-	if miro_core.emotion is not None:
-		affect_data = {
-			'emotion': go.Scatter(
-				# TODO: Make hovertext show both X and Y values together
-				marker={
-					'color': 'steelblue',
-					'size' : 15,
-					'line' : {
-						'width': 0.5,
-						'color': 'black'
-					}
-				},
-				mode='markers',
-				name='Emotion',
-				opacity=0.7,
-				x=np.array(np.round(miro_core.emotion.valence, decimals=3)),
-				y=np.array(np.round(miro_core.emotion.arousal, decimals=3)),
-			),
-			'mood'   : go.Scatter(
-				marker={
-					'color': 'seagreen',
-					'size' : 15,
-					'line' : {
-						'width': 0.5,
-						'color': 'black'
-					}
-				},
-				mode='markers',
-				name='Mood',
-				opacity=0.7,
-				x=np.array(np.round(miro_core.mood.valence, decimals=3)),
-				y=np.array(np.round(miro_core.mood.arousal, decimals=3)),
-			),
-			'sleep'  : go.Scatter(
-				marker={
-					'color': 'salmon',
-					'size' : 15,
-					'line' : {
-						'width': 0.5,
-						'color': 'black'
-					}
-				},
-				mode='markers',
-				name='Wakefulness',
-				opacity=0.7,
-				x=np.array(np.round(miro_core.sleep.wakefulness, decimals=3)),
-				y=np.array(np.round(miro_core.sleep.pressure, decimals=3)),
-			)
-		}
-
-		# Get the appropriate face from the 'faces' dictionary based on current mood values
-		for x in np.arange(0, 1, 0.2):
-			for y in np.arange(0, 1, 0.3):
-				# TODO: Change this, shouldn't be an if statement
-				if (x < affect_data['mood'].x <= x + 0.2) and (y < affect_data['mood'].y <= y + 0.3):
-					# Round the results to nearest 0.1 to prevent floating point errors; inaccurate but unimportant
-					affect_face = affect_faces['{0:.1f}'.format(x)]['{0:.1f}'.format(y)]
-
-		for x in np.arange(0, 1, 0.25):
-			# TODO: Change this, shouldn't be an if statement
-			if x < affect_data['sleep'].x <= x + 0.25:
-				sleep_face = sleep_faces['{0:.2f}'.format(x)]
-
-		# Update faces
-		dashboard_layouts['affect_layout']['images'] = [{
-			'layer'  : 'below',
-			'opacity': 0.8,
-			'sizing' : 'contain',
-			'sizex'  : 0.3,
-			'sizey'  : 0.3,
-			'source' : affect_face,
-			'x'      : 0.5,
-			'y'      : 0.5,
-			'xanchor': 'center',
-			'yanchor': 'middle'
-		}]
-
-		# TODO: If possible, just modify the 'source' attribute
-		dashboard_layouts['sleep_layout']['images'] = [{
-			'layer'  : 'below',
-			'opacity': 0.8,
-			'sizing' : 'contain',
-			'sizex'  : 0.3,
-			'sizey'  : 0.3,
-			'source' : sleep_face,
-			'x'      : 0.5,
-			'y'      : 0.5,
-			'xanchor': 'center',
-			'yanchor': 'middle'
-		}]
-
-		affect_figure = {
-			'data'  : [
-				affect_data['emotion'],
-				affect_data['mood'],
-				affect_data['sleep']
-			],
-			'layout': dashboard_layouts['affect_layout']
-		}
-
-		affect_figure_large = {
-			'data'  : [
-				affect_data['emotion'],
-				affect_data['mood'],
-			],
-			'layout': dashboard_layouts['affect_layout']
-		}
-
-		sleep_figure_large = {
-			'data'  : [affect_data['sleep']],
-			'layout': dashboard_layouts['sleep_layout']
-		}
-
-		output['affect-graph'] = affect_figure
-		output['affect-graph-large'] = affect_figure_large
-		output['sleep-graph-large'] = sleep_figure_large
 
-	else:
-		# TODO: Tidy up layout when no data is present
-		pass
-
-		output['affect-graph'] = {'layout': dashboard_layouts['affect_layout']}
-		output['affect-graph-large'] = {'layout': dashboard_layouts['affect_layout']}
-		output['sleep-graph-large'] = {'layout': dashboard_layouts['affect_layout']}
-
-	# Motivation
-	motivation_input = data
-	if miro_core.motivation is not None:
-		motivation_input['social'].append(miro_core.motivation.data[0])
-		motivation_input['ball'].append(miro_core.motivation.data[1])
-
-		# Trim data to plot length
-		if len(motivation_input['social']) >= con.MOTIVATION_LENGTH:
-			motivation_input['social'].pop(0)
-			motivation_input['ball'].pop(0)
-
-		motivation_data = {
-			'social': go.Scatter(
-				hoverinfo='none',
-				marker={
-					'color': 'steelblue',
-					'size' : 15,
-					'line' : {'width': 0.5}
-				},
-				mode='lines',
-				name='Social',
-				opacity=0.7,
-				x=np.arange(0, con.MOTIVATION_LENGTH, 1),
-				y=np.array(motivation_input['social']),
-			),
-			'ball'  : go.Scatter(
-				hoverinfo='none',
-				marker={
-					'color': 'mediumseagreen',
-					'size' : 15,
-					'line' : {'width': 0.5}
-				},
-				mode='lines',
-				name='Ball',
-				opacity=0.7,
-				x=np.arange(0, con.MOTIVATION_LENGTH, 1),
-				y=np.array(motivation_input['ball']),
-			),
-		}
-
-		motivation_figure = {
-			'data'  : [
-				motivation_data['social'],
-				motivation_data['ball'],
-			],
-			'layout': dashboard_layouts['motivation_layout']
-		}
-
-		motivation_figure_large = {
-			'data'  : [
-				motivation_data['social'],
-				motivation_data['ball'],
-			],
-			'layout': dashboard_layouts['motivation_layout']
-		}
-
-		output['motivation-graph'] = motivation_figure
-		output['motivation-graph-large'] = motivation_figure_large
+@app.callback(
+	[
+		Output('affect-graph', 'extendData'),
+		Output('affect-graph-large', 'extendData'),
+		Output('affect-seq', 'data')
+	],
+	[Input('interval-fast', 'n_intervals'), Input('affect-modal', 'is_open')],
+	[State('affect-seq', 'data'), State('url', 'search')]
+)
+def callback_affect(_, affect_open, seen, search):
+	robot = get_page_robot(search)
+	miro_core = get_core(robot)
+
+	version = miro_core.seq['core/animal/state']
+
+	return send_new(robot + '/affect', version, functools.partial(render_affect, miro_core), [
+		('affect-graph', True),
+		('affect-graph-large', affect_open),
+	], seen)
+
+
+@app.callback(
+	[
+		Output('affect-trail-graph-packed', 'data'),
+		Output('affect-trail-seq', 'data')
+	],
+	[
+		Input('interval-fast', 'n_intervals'),
+		# The telemetry stream doesn't carry the trail, so with telemetry pushed it follows the stream's events instead
+		Input('telemetry-tick', 'n_clicks'),
+		Input('affect-modal', 'is_open'),
+		Input('affect-tabs', 'active_tab')
+	],
+	[State('affect-trail-seq', 'data'), State('url', 'search')]
+)
+def callback_affect_trail(_, __, affect_open, active_tab, seen, search):
+	# Emotion and mood trajectories, sent only while their tab is showing
+	# As with motivation, each client is sent just the history samples it hasn't had, so keeping up with a long trail
+	# costs no more than the newest few samples per tick
+	# The graph is unmounted with the modal, so once hidden the count is reset and the whole trail is sent when shown
+	if not (affect_open and active_tab == 'affect-trail'):
+		if not seen:
+			raise PreventUpdate
+		return no_update, 0
+
+	miro_core = get_core(get_page_robot(search))
+	count, samples = miro_core.affect_history.since(seen or 0, con.AFFECT_TRAIL_LENGTH)
+	if not len(samples):
+		raise PreventUpdate
+
+	# Sample numbers colour the markers, fading older samples out
+	sample_numbers = typed_array(np.arange(count - len(samples), count), 'i4')
+
+	return [
+		{
+			'x'           : [typed_array(samples[:, 0]), typed_array(samples[:, 2])],
+			'y'           : [typed_array(samples[:, 1]), typed_array(samples[:, 3])],
+			'marker.color': [sample_numbers, sample_numbers],
+		},
+		[0, 1],
+		con.AFFECT_TRAIL_LENGTH
+	], count
 
-	else:
-		output['motivation-graph'] = {'layout': dashboard_layouts['motivation_layout']}
-		output['motivation-graph-large'] = {'layout': dashboard_layouts['motivation_layout']}
-
-	# Return all outputs
-	return \
-		output['action-graph'], \
-		output['action-graph-large'], \
-		output['affect-graph'], \
-		output['affect-graph-large'], \
-		output['sleep-graph-large'], \
-		output['motivation-graph'], \
-		output['motivation-graph-large'], \
-		motivation_input
+
+@app.callback(
+	[
+		Output('sleep-graph-large', 'extendData'),
+		Output('sleep-seq', 'data')
+	],
+	[Input('interval-fast', 'n_intervals'), Input('affect-modal', 'is_open')],
+	[State('sleep-seq', 'data'), State('url', 'search')]
+)
+def callback_sleep(_, affect_open, seen, search):
+	robot = get_page_robot(search)
+	miro_core = get_core(robot)
+
+	version = miro_core.seq['core/animal/state']
+
+	return send_new(robot + '/sleep', version, functools.partial(render_sleep, miro_core), [
+		('sleep-graph-large', affect_open),
+	], seen)
+
+
+@app.callback(
+	[
+		Output('motivation-graph-packed', 'data'),
+		Output('motivation-graph-large-packed', 'data'),
+		Output('motivation-seq', 'data')
+	],
+	[Input('interval-fast', 'n_intervals'), Input('motivation-modal', 'is_open')],
+	[State('motivation-seq', 'data'), State('url', 'search')]
+)
+def callback_motivation(_, motivation_open, seen, search):
+	miro_core = get_core(get_page_robot(search))
+
+	# History is kept server-side by the MiRo client, so each graph is only sent the samples it hasn't seen yet
+	# Graphs that are hidden catch up (to the last MOTIVATION_LENGTH samples) when shown; a closed modal unmounts its
+	# graph, so its record is dropped and the reopened graph is sent the whole of that
+	seen = dict(seen or {})
+	hidden = []
+	output = {
+		'motivation-graph'      : no_update,
+		'motivation-graph-large': no_update,
+	}
+	for graph, visible in [('motivation-graph', con.MOTIVATION_CARD), ('motivation-graph-large', motivation_open)]:
+		if not visible:
+			if graph in seen:
+				del seen[graph]
+				hidden.append(graph)
+			continue
+		count, samples = miro_core.motivation_history.since(seen.get(graph, 0), con.MOTIVATION_LENGTH)
+		if len(samples):
+			output[graph] = [
+				{'y': [typed_array(samples[:, 0]), typed_array(samples[:, 1])]},
+				[0, 1],
+				con.MOTIVATION_LENGTH
+			]
+			seen[graph] = count
+
+	if output['motivation-graph'] is no_update and output['motivation-graph-large'] is no_update and not hidden:
+		raise PreventUpdate
+
+	return output['motivation-graph'], output['motivation-graph-large'], seen
 
 # FIXME: Alerts are broken until MRI is updated
 # output['ball-alert'], \
@@ -309,3 +296,34 @@ def callback_fast(_, data):
 # output['affect-graph'], \
 # output['affect-graph-large'], \
 # output['sleep-graph-large']
+
+
+# Numeric arrays are sent as binary typed arrays to a store beside each graph, and unpacked into the graph's
+# 'extendData' in the browser
+for graph in [
+	'action-graph',
+	'action-graph-large',
+	'affect-trail-graph',
+	'motivation-graph',
+	'motivation-graph-large'
+]:
+	app.clientside_callback(
+		ClientsideFunction(namespace='dashboard', function_name='unpack_extend'),
+		Output(graph, 'extendData'),
+		[Input('{}-packed'.format(graph), 'data')]
+	)
+
+
+# Background faces are chosen in the browser from the points sent above, and set on the plot directly (see
+# assets/clientside.js); the 'figure' output is never actually updated
+for graph, function_name in [
+	('affect-graph', 'affect_face'),
+	('affect-graph-large', 'affect_face'),
+	('sleep-graph-large', 'sleep_face')
+]:
+	app.clientside_callback(
+		ClientsideFunction(namespace='dashboard', function_name=function_name),
+		Output(graph, 'figure'),
+		[Input(graph, 'extendData')],
+		[State(graph, 'id'), State('face-table', 'data')]
+	)
@@ -0,0 +1,45 @@
+# Plotly Dash modules
+from dash.dependencies import Input, Output
+import dash_bootstrap_components as dbc
+
+# MiRo dashboard modules
+from app import app
+from models.robots import get_page_robot, robots
+from models.streams import stream_url
+
+
+# Runs once per page load, pointing the page's streams and robot selector at the robot it shows
+@app.callback(
+	[
+		Output('robot-select', 'children'),
+		Output('audio-pri-wide', 'src'),
+		Output('camera-img-left', 'src'),
+		Output('camera-img-right', 'src'),
+		Output('camera-img-left-large', 'src'),
+		Output('camera-img-right-large', 'src'),
+	],
+	[Input('url', 'search')]
+)
+def callback_robot(search):
+	robot = get_page_robot(search)
+
+	# Links reload the page, so every display starts afresh with the chosen robot's data
+	if len(robots) > 1:
+		robot_select = dbc.DropdownMenu(
+			[dbc.DropdownMenuItem(name, href='?robot=' + name, external_link=True) for name in robots],
+			label='Robot: ' + robot,
+			color='primary',
+			right=True,
+			bs_size='sm'
+		)
+	else:
+		robot_select = None
+
+	# Stream URLs for the first robot match the layout's own, so its images don't reconnect
+	return \
+		robot_select, \
+		stream_url('priw', robot), \
+		stream_url('caml', robot), \
+		stream_url('camr', robot), \
+		stream_url('caml', robot, large=True), \
+		stream_url('camr', robot, large=True)
@@ -0,0 +1,204 @@
+# Plotly Dash modules
+from flask import jsonify, request
+import dash
+import plotly
+
+# MiRo dashboard modules
+from app import app
+import dashboard_constants as con
+from models.frame_cache import encode_cache
+
+# Other modules
+import base64
+import gzip
+import numpy as np
+import sys
+import threading
+import time
+
+# Optional native encoders; the dashboard works without them, just more slowly
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
+# Dash versions use_encoder() knows how to hook into (written against Dash 1.21.0, see below)
+ENCODER_DASH_VERSIONS = ('1.',)
+
+# Responses worth compressing
+COMPRESS_TYPES = ['application/json', 'application/javascript', 'text/javascript', 'text/css', 'text/html']
+
+# Dash's component bundles only change when Dash is upgraded, so each is compressed once per encoding and the result
+# kept, by path and ETag (fingerprinted paths change with their content instead)
+STATIC_PATH = '/_dash-component-suites/'
+static_cache = {}
+static_cache_lock = threading.Lock()
+
+
+def typed_array(values, dtype=con.TYPED_ARRAY_DTYPE):
+	# Numeric array in plotly's binary form: little-endian values, base64 encoded
+	# Unpacked again in the browser (see assets/clientside.js), as the plotly.js bundled with Dash 1.x can't read these
+	data = np.asarray(values, dtype='<' + dtype)
+
+	return {
+		'dtype': dtype,
+		'bdata': base64.b64encode(data.tobytes()).decode('ascii')
+	}
+
+
+class ResponseStats:
+	# Running totals for callback responses, to see what encoding and compression are costing and saving
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.start = time.time()
+		self.encoded = 0
+		self.encode_time = 0
+		self.responses = 0
+		self.raw_bytes = 0
+		self.sent_bytes = 0
+
+	def add_encode(self, seconds):
+		with self.lock:
+			self.encoded += 1
+			self.encode_time += seconds
+
+	def add_response(self, raw, sent):
+		with self.lock:
+			self.responses += 1
+			self.raw_bytes += raw
+			self.sent_bytes += sent
+
+	def summary(self):
+		with self.lock:
+			elapsed = time.time() - self.start
+			return {
+				'encoder'           : 'orjson' if json_encoder is FastJSONEncoder else 'plotly',
+				'encodes'           : self.encoded,
+				'mean_encode_ms'    : 1000 * self.encode_time / self.encoded if self.encoded else None,
+				'responses'         : self.responses,
+				'raw_bytes'         : self.raw_bytes,
+				'sent_bytes'        : self.sent_bytes,
+				'raw_bytes_per_sec' : self.raw_bytes / elapsed,
+				'sent_bytes_per_sec': self.sent_bytes / elapsed,
+			}
+
+
+response_stats = ResponseStats()
+
+
+class FastJSONEncoder(plotly.utils.PlotlyJSONEncoder):
+	# Plotly's encoder with the encoding itself done by orjson, which handles numpy arrays natively
+	# Anything orjson can't serialise directly is passed through plotly's default() (graph objects, dates etc.), and
+	# NaN / Infinity become null as they do in plotly's own encoder
+	def encode(self, o):
+		start = time.time()
+		try:
+			encoded = orjson.dumps(
+				o,
+				default=self.default,
+				option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+			).decode('utf-8')
+		except TypeError:
+			# Retry with plotly's encoder, which gives Dash the error message it expects if this also fails
+			encoded = super().encode(o)
+		response_stats.add_encode(time.time() - start)
+
+		return encoded
+
+
+class Override:
+	# Stand-in for a module, with some of its attributes replaced
+	def __init__(self, module, **attributes):
+		self.__dict__.update(attributes)
+		self.module = module
+
+	def __getattr__(self, name):
+		return getattr(self.module, name)
+
+
+def use_encoder(encoder):
+	# Have Dash serialise layouts and callback responses with 'encoder'
+	# Dash 1.x has no setting for this, but dash/dash.py (as of 1.21.0) calls json.dumps(..., cls=plotly.utils.
+	# PlotlyJSONEncoder) through its own module's 'plotly' whenever it serialises; only that name is pointed at a
+	# stand-in, so plotly itself (and everything else using it) is left as it is
+	# Dash 2 serialises through dash._utils.to_json instead, so other versions are left alone
+	dash_module = sys.modules[dash.Dash.__module__]
+	if not dash.__version__.startswith(ENCODER_DASH_VERSIONS) or getattr(dash_module, 'plotly', None) is not plotly:
+		# Said out loud, as other versions of Dash serialise some other way, which this would otherwise miss
+		print('Dash {} has no plotly encoder to replace, so its responses use its own'.format(dash.__version__))
+		return False
+
+	dash_module.plotly = Override(plotly, utils=Override(plotly.utils, PlotlyJSONEncoder=encoder))
+
+	return True
+
+
+# Encoder for Dash's responses, and for the dashboard's own JSON to match
+if con.FAST_JSON and orjson is not None and use_encoder(FastJSONEncoder):
+	json_encoder = FastJSONEncoder
+else:
+	json_encoder = plotly.utils.PlotlyJSONEncoder
+
+
+def choose_encoding():
+	# Best compression the client accepts, preferring brotli when it's installed
+	offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+	return request.accept_encodings.best_match(offered)
+
+
+def compress_data(data, encoding):
+	if encoding == 'br':
+		return brotli.compress(data, quality=con.BROTLI_QUALITY)
+
+	return gzip.compress(data, compresslevel=con.GZIP_LEVEL)
+
+
+def compress_static(data, encoding, etag):
+	key = (request.path, etag, encoding)
+	with static_cache_lock:
+		compressed = static_cache.get(key)
+	if compressed is None:
+		compressed = compress_data(data, encoding)
+		with static_cache_lock:
+			static_cache[key] = compressed
+
+	return compressed
+
+
+@app.server.after_request
+def compress(response):
+	if request.path.endswith('_dash-update-component') and response.status_code == 204:
+		# Cancelled callback (PreventUpdate), nothing sent
+		response_stats.add_response(0, 0)
+
+	# Streams (images, telemetry) and files are sent as they are
+	if response.is_streamed or response.direct_passthrough or response.status_code != 200:
+		return response
+	if response.mimetype not in COMPRESS_TYPES or 'Content-Encoding' in response.headers:
+		return response
+
+	data = response.get_data()
+	encoding = choose_encoding() if len(data) >= con.COMPRESS_MIN_SIZE else None
+	if encoding is not None:
+		if request.path.startswith(STATIC_PATH):
+			response.set_data(compress_static(data, encoding, response.get_etag()[0]))
+		else:
+			response.set_data(compress_data(data, encoding))
+		response.headers['Content-Encoding'] = encoding
+		response.headers['Vary'] = 'Accept-Encoding'
+
+	if request.path.endswith('_dash-update-component'):
+		response_stats.add_response(len(data), response.content_length)
+
+	return response
+
+
+@app.server.route(con.STATS_PATH)
+def stats():
+	return jsonify(dict(response_stats.summary(), frame_cache=encode_cache.summary()))
@@ -0,0 +1,75 @@
+# MiRo dashboard modules
+import dashboard_constants as con
+
+# Other modules
+import collections
+import threading
+
+# Supported codecs as (OpenCV extension, MIME image type, name of the OpenCV quality parameter)
+# PNG 'quality' is its compression level (0-9); JPEG and WebP quality runs from 0 to 100
+CODECS = {
+	'png' : ('.png', 'png', 'IMWRITE_PNG_COMPRESSION'),
+	'jpeg': ('.jpg', 'jpeg', 'IMWRITE_JPEG_QUALITY'),
+	'webp': ('.webp', 'webp', 'IMWRITE_WEBP_QUALITY'),
+}
+
+# Pseudo-codec forwarding a JPEG frame exactly as it was received
+ORIGINAL = 'original'
+
+
+class EncodeCache:
+	# Bounded LRU cache of encoded frames keyed by (source, frame sequence, size, codec, quality, undistorted)
+	# Each rendition of a frame is encoded at most once, however many streams ask for it
+	def __init__(self, max_entries=con.ENCODE_CACHE_SIZE):
+		self.max_entries = max_entries
+		self.entries = collections.OrderedDict()
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def lookup(self, key, compute):
+		with self.lock:
+			if key in self.entries:
+				self.entries.move_to_end(key)
+				self.hits += 1
+				return self.entries[key]
+
+		# Encode outside the lock so different renditions can be produced in parallel
+		value = compute()
+
+		with self.lock:
+			self.misses += 1
+			self.entries[key] = value
+			while len(self.entries) > self.max_entries:
+				self.entries.popitem(last=False)
+
+		return value
+
+	def encoded(self, source, frame, size=None, codec='png', quality=None, undistorted=False):
+		# Returns (image bytes, MIME image type)
+		key = (source, frame.seq, size, codec, quality, undistorted)
+
+		def encode():
+			if codec == ORIGINAL:
+				return frame.jpeg(), 'jpeg'
+
+			# OpenCV is imported on first use, like the ROS interface (see models/robots.py)
+			import cv2
+			ext, image_type, quality_param = CODECS[codec]
+			params = () if quality is None else (getattr(cv2, quality_param), quality)
+			return frame.encoded(ext, size, undistorted, params=params), image_type
+
+		return self.lookup(key, encode)
+
+	def summary(self):
+		# Reported at STATS_PATH, to see how often frames are sent again rather than encoded again
+		with self.lock:
+			return {
+				'hits'   : self.hits,
+				'misses' : self.misses,
+				'entries': len(self.entries),
+			}
+
+
+# Shared by all callbacks
+encode_cache = EncodeCache()
@@ -0,0 +1,50 @@
+# Plotly Dash modules
+from flask import Response, abort, request
+
+# MiRo dashboard modules
+from app import app
+import dashboard_constants as con
+from models.basic_functions.time_series import METHODS
+from models.encoding import json_encoder
+from models.robots import get_core, get_robot
+
+# Other modules
+import json
+import math
+import time
+
+
+def get_history(name, seconds, pixels, method='minmax', end=None, robot=None):
+	# History of one of a robot's MiRoCore time series (affect, motivation, priority, sleep) over the last 'seconds' up
+	# to 'end' (default now), reduced to about 'pixels' points
+	# Cost depends on the pixel budget rather than the number of samples in the range
+	if end is None:
+		end = time.time()
+
+	return get_core(get_robot(robot)).series[name].query(end - seconds, end, pixels, method)
+
+
+@app.server.route(con.HISTORY_PATH + '<name>')
+def history(name):
+	# eg. /history/motivation?seconds=3600&width=500&method=lttb&robot=miro01
+	robot = get_robot(request.args.get('robot'))
+	if name not in get_core(robot).series:
+		abort(404)
+	method = request.args.get('method', 'minmax')
+	if method not in METHODS:
+		abort(400)
+
+	try:
+		seconds = float(request.args.get('seconds', con.HISTORY_SECONDS))
+		width = max(1, min(int(request.args.get('width', con.HISTORY_WIDTH)), con.HISTORY_MAX_WIDTH))
+		end = float(request.args['end']) if 'end' in request.args else None
+	except ValueError:
+		abort(400)
+	# Times must be real, and can't run backwards
+	if not math.isfinite(seconds) or seconds < 0 or (end is not None and (not math.isfinite(end) or end < 0)):
+		abort(400)
+
+	return Response(
+		json.dumps(get_history(name, seconds, width, method, end, robot), cls=json_encoder),
+		mimetype='application/json'
+	)
@@ -0,0 +1,67 @@
+# Plotly Dash modules
+from flask import Response, request
+
+# MiRo dashboard modules
+from app import app
+import dashboard_constants as con
+from models.encoding import brotli, choose_encoding, json_encoder
+
+# Other modules
+import gzip
+import hashlib
+import json
+import threading
+
+# The layout is a large static tree (rows, modals with their help text, tooltips), which Dash would otherwise serialise
+# again for every page load; here it's serialised once, kept compressed, and sent only when the browser's copy is stale
+
+
+class LayoutCache:
+	def __init__(self):
+		self.lock = threading.Lock()
+		# Layout body for each content encoding (None for uncompressed) and its ETag
+		self.bodies = None
+		self.etag = None
+
+	def build(self):
+		# Serialised as Dash serves it, with whichever JSON encoder is in use (see models/encoding.py)
+		data = json.dumps(app.layout, cls=json_encoder).encode('utf-8')
+		bodies = {
+			None  : data,
+			'gzip': gzip.compress(data, compresslevel=con.LAYOUT_GZIP_LEVEL),
+		}
+		if brotli is not None:
+			bodies['br'] = brotli.compress(data, quality=con.LAYOUT_BROTLI_QUALITY)
+
+		self.etag = hashlib.sha1(data).hexdigest()[:16]
+		self.bodies = bodies
+
+	def prepare(self):
+		# Called once the layout is complete; until then (or if it never is) the first page load builds the cache
+		with self.lock:
+			if self.bodies is None:
+				self.build()
+
+	def response(self):
+		self.prepare()
+		encoding = choose_encoding()
+		response = Response(self.bodies[encoding], mimetype='application/json')
+		if encoding is not None:
+			response.headers['Content-Encoding'] = encoding
+		response.headers['Vary'] = 'Accept-Encoding'
+		response.headers['Cache-Control'] = con.LAYOUT_CACHE_CONTROL
+		# Each encoding is a different body, so gets a tag of its own
+		response.set_etag(self.etag if encoding is None else '{}-{}'.format(self.etag, encoding))
+
+		# '304 Not Modified' (with no body) if the browser already has it
+		return response.make_conditional(request)
+
+
+layout_cache = LayoutCache()
+
+
+@app.server.before_request
+def serve_cached_layout():
+	# Answers in place of Dash's own '_dash-layout' route
+	if request.path.endswith('_dash-layout'):
+		return layout_cache.response()
@@ -0,0 +1,54 @@
+# Other modules
+import threading
+
+
+class RenderCache:
+	# Single-flight cache of rendered outputs, keyed by name and the version of the data they were rendered from
+	# When several clients ask for the same output at the same version, one of them renders it while the rest wait
+	# and reuse the result, so the work done per tick doesn't grow with the number of viewers
+	def __init__(self):
+		self.lock = threading.Lock()
+		# Latest result for each name, as (version, result)
+		self.results = {}
+		# Renders in progress, keyed by (name, version)
+		self.in_flight = {}
+
+	def get(self, name, version, render):
+		key = (name, version)
+		with self.lock:
+			cached = self.results.get(name)
+			if cached is not None and cached[0] == version:
+				return cached[1]
+
+			event = self.in_flight.get(key)
+			leader = event is None
+			if leader:
+				event = threading.Event()
+				self.in_flight[key] = event
+
+		if leader:
+			try:
+				result = render()
+				with self.lock:
+					# Renders of different versions can finish out of order; an older one mustn't replace a newer
+					cached = self.results.get(name)
+					if cached is None or version >= cached[0]:
+						self.results[name] = (version, result)
+				return result
+			finally:
+				with self.lock:
+					del self.in_flight[key]
+				event.set()
+
+		event.wait()
+		with self.lock:
+			cached = self.results.get(name)
+		if cached is not None and cached[0] == version:
+			return cached[1]
+
+		# The render failed or has already been superseded by a newer version
+		return render()
+
+
+# Shared by all callbacks
+render_cache = RenderCache()
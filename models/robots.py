@@ -0,0 +1,46 @@
+# MiRo dashboard modules
+import dashboard_constants as con
+
+# MiRo interface modules
+# The ROS interface itself (and with it rospy and OpenCV) is only imported when a client is first asked for, so the
+# dashboard can start serving pages without waiting for it (see index.py)
+from models.basic_functions.robot_config import robot_names
+
+# Other modules
+from urllib.parse import parse_qs
+
+# Robots this dashboard can show, one at a time per page (chosen with '?robot=' in the page URL)
+robots = robot_names()
+
+
+def get_robot(name):
+	# Validated robot name, defaulting to the first robot
+	return name if name in robots else robots[0]
+
+
+def get_page_robot(search):
+	# Robot chosen by a page's query string (the 'search' property of the 'url' dcc.Location)
+	return get_robot(parse_qs((search or '').lstrip('?')).get('robot', [None])[0])
+
+
+def get_core(robot):
+	# With the telemetry bus, robot data is read from the ingest process's shared memory instead of subscribed to here
+	if con.TELEMETRY_BUS:
+		from models.basic_functions import telemetry_bus as bus
+		return bus.get_bus_client(bus.SharedCore, robot)
+
+	from models.basic_functions import miro_ros_interface as mri
+	return mri.get_client(mri.MiRoCore, robot)
+
+
+def get_perception(robot):
+	if con.TELEMETRY_BUS:
+		from models.basic_functions import telemetry_bus as bus
+		return bus.get_bus_client(bus.SharedPerception, robot)
+
+	from models.basic_functions import miro_ros_interface as mri
+	miro_perception = mri.get_client(mri.MiRoPerception, robot)
+	# Only decode camera frames ahead of time if the dashboard will need their pixels
+	miro_perception.decode_ahead = con.CAM_UNDISTORT or not con.CAM_PASSTHROUGH
+
+	return miro_perception
@@ -0,0 +1,107 @@
+# MiRo dashboard modules
+from app import app
+import dashboard_constants as con
+from models import startup
+
+# Other modules
+import logging
+import threading
+
+# Optional production WSGI server; without it the dashboard runs on Flask's development server
+try:
+	import waitress
+except ImportError:
+	waitress = None
+
+
+class OverloadGuard:
+	# WSGI middleware turning work the server can't keep up with away at once ('503 Service Unavailable'), rather than
+	# letting it queue up behind everything else
+	# Streams (MJPEG images, telemetry) hold a server thread each for as long as they are open, so they get a limit of
+	# their own, leaving the rest of the thread pool for callbacks and page loads
+	def __init__(self, wsgi_app, stream_limit, queue_limit):
+		self.wsgi_app = wsgi_app
+		self.streams = threading.BoundedSemaphore(stream_limit)
+		self.queue_limit = queue_limit
+		# Requests waiting for a server thread; set by serve(), as the development server has no such queue
+		self.queue_depth = lambda: 0
+		self.rejected = 0
+
+	def __call__(self, environ, start_response):
+		path = environ.get('PATH_INFO', '')
+		if path.startswith(con.STREAM_PATH) or path == con.TELEMETRY_PATH:
+			if not self.streams.acquire(blocking=False):
+				return self.overloaded(start_response)
+			try:
+				return StreamResponse(self.wsgi_app(environ, start_response), self.streams.release)
+			except BaseException:
+				self.streams.release()
+				raise
+
+		# A request still has its place in the queue counted against it; answering cheaply while the queue is long
+		# drains it quickly, so the next interval's requests are served fresh instead of stale ones late
+		if self.queue_depth() > self.queue_limit:
+			return self.overloaded(start_response)
+
+		return self.wsgi_app(environ, start_response)
+
+	def overloaded(self, start_response):
+		self.rejected += 1
+		body = b'Dashboard busy, try again shortly\n'
+		start_response('503 Service Unavailable', [
+			('Content-Type', 'text/plain'),
+			('Content-Length', str(len(body))),
+			('Retry-After', str(con.RETRY_AFTER)),
+		])
+
+		return [body]
+
+
+class StreamResponse:
+	# Streamed response body that releases its stream slot once the server has finished with it
+	def __init__(self, body, release):
+		self.body = body
+		self.release = release
+
+	def __iter__(self):
+		return iter(self.body)
+
+	def close(self):
+		try:
+			if hasattr(self.body, 'close'):
+				self.body.close()
+		finally:
+			self.release()
+
+
+def guard(stream_limit=con.STREAM_LIMIT, queue_limit=con.QUEUE_LIMIT):
+	# Put an OverloadGuard in front of the dashboard's Flask app
+	overload_guard = OverloadGuard(app.server.wsgi_app, stream_limit, queue_limit)
+	app.server.wsgi_app = overload_guard
+
+	return overload_guard
+
+
+def serve(host, port, threads, stream_limit, queue_limit, connection_limit, backlog):
+	# Production server: a fixed pool of threads serving keep-alive connections, with overload shedding
+	# Each open stream needs a thread of its own, so the pool has 'threads' for ordinary requests plus one per stream
+	overload_guard = guard(stream_limit, queue_limit)
+	server = waitress.create_server(
+		app.server,
+		host=host,
+		port=port,
+		threads=threads + stream_limit,
+		connection_limit=connection_limit,
+		backlog=backlog,
+		channel_timeout=con.CHANNEL_TIMEOUT,
+		ident='MiRo Dashboard'
+	)
+	overload_guard.queue_depth = lambda: len(server.task_dispatcher.queue)
+	# Queueing is expected under load, and handled by the guard, so waitress needn't warn about every queued request
+	logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+
+	startup.phase('Listening')
+	print('Serving on http://{}:{} with {} threads (up to {} streams)'.format(
+		host, port, threads + stream_limit, stream_limit
+	))
+	server.run()
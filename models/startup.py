@@ -0,0 +1,15 @@
+# Startup timing, so a slow start can be put down to the phase responsible
+# Imported first by index.py, so times run from (roughly) when the dashboard was launched
+
+# Other modules
+import threading
+import time
+
+started = time.time()
+lock = threading.Lock()
+
+
+def phase(name):
+	# Report that a startup phase has finished; phases in background threads report as they finish
+	with lock:
+		print('{:<40} done after {:.3f}s'.format(name, time.time() - started), flush=True)
@@ -0,0 +1,121 @@
+# Plotly Dash modules
+from flask import Response, abort, request
+
+# MiRo dashboard modules
+from app import app
+import dashboard_constants as con
+from models.frame_cache import encode_cache, ORIGINAL
+from models.robots import get_core, get_perception, get_robot, robots
+
+# Other modules
+import time
+
+# Client of a robot holding each streamable source, and the name of its latest frame there
+stream_sources = {
+	'caml': (get_perception, 'caml_frame'),
+	'camr': (get_perception, 'camr_frame'),
+	'pril': (get_core, 'pril_frame'),
+	'prir': (get_core, 'prir_frame'),
+	'priw': (get_core, 'priw_frame'),
+}
+
+# Test patterns shown until a source's first frame arrives
+stream_placeholders = {
+	'caml': 'test_cam_sml.png',
+	'camr': 'test_cam_sml.png',
+	'priw': 'test_priw.png',
+}
+placeholder_images = {}
+
+
+def placeholder(source):
+	if source not in stream_placeholders:
+		return None
+	if source not in placeholder_images:
+		# OpenCV is imported on first use, like the ROS interface (see models/robots.py)
+		import cv2
+		image = cv2.imread(con.ASSET_PATH + stream_placeholders[source])
+		placeholder_images[source] = cv2.imencode('.jpg', image)[1].tobytes()
+
+	return placeholder_images[source]
+
+
+def stream_url(source, robot, large=False):
+	# URL of a source's stream; the first robot's streams need no robot argument
+	args = []
+	if large:
+		args.append('size=large')
+	if robot != robots[0]:
+		args.append('robot=' + robot)
+
+	return con.STREAM_PATH + source + ('?' + '&'.join(args) if args else '')
+
+
+def render(source, frame, large):
+	# JPEG bytes for one frame; the encode cache means each frame is encoded once however many clients are watching
+	if source in ('caml', 'camr'):
+		# Send camera frames as they arrived when no pixel processing is needed; the browser does the scaling
+		if con.CAM_PASSTHROUGH and not con.CAM_UNDISTORT and frame.jpeg() is not None:
+			return encode_cache.encoded(source, frame, codec=ORIGINAL)[0]
+
+		# Resize image for speedier updates; OpenCV sizes are (width, height)
+		scale = 1 if large else con.CAM_SCALE
+		width, height = frame.size()
+		size = (int(width / scale), int(height / scale))
+		return encode_cache.encoded(source, frame, size, 'jpeg', con.CAM_QUALITY, con.CAM_UNDISTORT)[0]
+
+	return encode_cache.encoded(source, frame, codec='jpeg', quality=con.PRI_QUALITY)[0]
+
+
+def stream_part(image):
+	return b''.join([
+		b'--frame\r\n',
+		b'Content-Type: image/jpeg\r\n',
+		'Content-Length: {}\r\n\r\n'.format(len(image)).encode(),
+		image,
+		b'\r\n'
+	])
+
+
+def frame_stream(source, robot, large):
+	# Send each new frame as soon as it arrives, rather than on a fixed Dash interval
+	# The stream sleeps until its client reports a new frame, so idle streams cost nothing between keepalives
+	get_client, name = stream_sources[source]
+	client = get_client(robot)
+	last_seq = None
+	part = None
+	image = placeholder(source)
+	if image is not None:
+		part = stream_part(image)
+		yield part
+	sent = time.time()
+
+	with client.watching([name]) as changed:
+		while True:
+			changed.clear()
+			frame = getattr(client, name)
+			if frame is not None and frame.seq != last_seq:
+				last_seq = frame.seq
+				part = stream_part(render(source, frame, large))
+				yield part
+				sent = time.time()
+			elif part is not None and time.time() - sent >= con.STREAM_KEEPALIVE:
+				# Writing is the only way to find out the browser has gone, which ends the stream and frees its thread
+				yield part
+				sent = time.time()
+
+			changed.wait(con.STREAM_KEEPALIVE if part is None else max(0, sent + con.STREAM_KEEPALIVE - time.time()))
+
+
+@app.server.route(con.STREAM_PATH + '<source>')
+def stream(source):
+	# Motion JPEG stream for use as an image 'src'; add '?size=large' for full resolution camera images, and
+	# '?robot=<name>' for robots other than the first
+	if source not in stream_sources:
+		abort(404)
+
+	return Response(
+		frame_stream(source, get_robot(request.args.get('robot')), request.args.get('size') == 'large'),
+		mimetype='multipart/x-mixed-replace; boundary=frame',
+		headers={'Cache-Control': 'no-cache'}
+	)
@@ -0,0 +1,94 @@
+# Plotly Dash modules
+from flask import Response, request
+
+# MiRo dashboard modules
+from app import app
+import dashboard_constants as con
+from views.faces import get_affect_face, get_sleep_face
+from models.robots import get_core, get_robot
+
+# Other modules
+import json
+import time
+
+# Topics behind each display
+telemetry_topics = {
+	'action'    : ['core/selection/priority', 'core/selection/inhibition'],
+	'affect'    : ['core/animal/state'],
+}
+# Topics the stream wakes up for: the displays' and motivation's
+watched_topics = [topic for topics in telemetry_topics.values() for topic in topics] + ['motivation']
+
+
+def round_list(data):
+	return [round(x, 3) for x in data]
+
+
+def get_update(miro_core, display):
+	# Compact update for one display, applied to its graphs by assets/telemetry.js
+	if display == 'action':
+		if miro_core.selection_priority is None or miro_core.selection_inhibition is None:
+			return None
+		return {
+			# Priority is made negative so it appears to the left of the bar chart
+			'priority'  : round_list(-x for x in miro_core.selection_priority.data),
+			'inhibition': round_list(miro_core.selection_inhibition.data),
+		}
+
+	if display == 'affect':
+		if miro_core.emotion is None:
+			return None
+		return {
+			'emotion'    : round_list([miro_core.emotion.valence, miro_core.emotion.arousal]),
+			'mood'       : round_list([miro_core.mood.valence, miro_core.mood.arousal]),
+			'sleep'      : round_list([miro_core.sleep.wakefulness, miro_core.sleep.pressure]),
+			'affect_face': get_affect_face(miro_core.mood.valence, miro_core.mood.arousal),
+			'sleep_face' : get_sleep_face(miro_core.sleep.wakefulness),
+		}
+
+
+def telemetry_stream(miro_core):
+	# Server-sent events carrying only the displays whose topics have published since the last event
+	# The stream sleeps until one of its topics publishes; messages arriving within TELEMETRY_INTERVAL of the last
+	# event are sent together in the next
+	last_seq = {}
+	motivation_count = 0
+	sent = time.time()
+	with miro_core.watching(watched_topics) as changed:
+		while True:
+			changed.clear()
+			update = {}
+			for display, topics in telemetry_topics.items():
+				seq = [miro_core.seq[topic] for topic in topics]
+				if seq != last_seq.get(display):
+					last_seq[display] = seq
+					data = get_update(miro_core, display)
+					if data is not None:
+						update[display] = data
+
+			# Motivation history is sent as every sample this connection hasn't had yet
+			count, samples = miro_core.motivation_history.since(motivation_count, con.MOTIVATION_LENGTH)
+			if len(samples):
+				motivation_count = count
+				update['motivation'] = [round_list(samples[:, 0]), round_list(samples[:, 1])]
+
+			if update:
+				yield 'data: {}\n\n'.format(json.dumps(update, separators=(',', ':')))
+				sent = time.time()
+				time.sleep(con.TELEMETRY_INTERVAL)
+			elif time.time() - sent >= con.STREAM_KEEPALIVE:
+				# Comment line, ignored by the browser, so a closed connection is noticed and its thread freed
+				yield ':\n\n'
+				sent = time.time()
+
+			changed.wait(max(0, sent + con.STREAM_KEEPALIVE - time.time()))
+
+
+@app.server.route(con.TELEMETRY_PATH)
+def telemetry():
+	# One robot per connection, chosen with '?robot=<name>' (default: the first)
+	return Response(
+		telemetry_stream(get_core(get_robot(request.args.get('robot')))),
+		mimetype='text/event-stream',
+		headers={'Cache-Control': 'no-cache'}
+	)
@@ -2,6 +2,9 @@
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 
+# MiRo dashboard modules
+from views.figures import dashboard_figures
+
 card = dbc.Card(
 	[
 		dbc.CardHeader(
@@ -20,6 +23,7 @@ card = dbc.Card(
 		dbc.CardBody(
 			dcc.Graph(
 				id='action-graph',
+				figure=dashboard_figures['action'],
 				config={'displayModeBar': False},
 				style={
 					'height': '150px',
@@ -36,6 +40,7 @@ card = dbc.Card(
 modal_tab = dbc.Tab(
 	dcc.Graph(
 		id='action-graph-large',
+		figure=dashboard_figures['action'],
 		config={'displayModeBar': False},
 		style={
 			'height': '300px',
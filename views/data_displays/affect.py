@@ -3,6 +3,9 @@ import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 import dash_html_components as html
 
+# MiRo dashboard modules
+from views.figures import dashboard_figures
+
 card = dbc.Card(
 	[
 		dbc.CardHeader(
@@ -21,6 +24,7 @@ card = dbc.Card(
 		dbc.CardBody(
 			dcc.Graph(
 				id='affect-graph',
+				figure=dashboard_figures['affect'],
 				# 'Animate' property is incompatible with changing background images
 				# animate=True,
 				config={'displayModeBar': False},
@@ -46,6 +50,7 @@ modal_tab = dbc.Tab(
 				html.Td(
 					dcc.Graph(
 						id='affect-graph-large',
+						figure=dashboard_figures['affect_large'],
 						# 'Animate' property is incompatible with changing background images
 						# animate=True,
 						config={'displayModeBar': False},
@@ -58,6 +63,7 @@ modal_tab = dbc.Tab(
 				html.Td(
 					dcc.Graph(
 						id='sleep-graph-large',
+						figure=dashboard_figures['sleep_large'],
 						# 'Animate' property is incompatible with changing images
 						# animate=True,
 						config={'displayModeBar': False},
@@ -73,3 +79,17 @@ modal_tab = dbc.Tab(
 	),
 	label='Live data'
 )
+
+trail_tab = dbc.Tab(
+	dcc.Graph(
+		id='affect-trail-graph',
+		figure=dashboard_figures['affect_trail'],
+		config={'displayModeBar': False},
+		style={
+			'height': '500px',
+			'width' : '500px',
+		}
+	),
+	label='Trajectory',
+	tab_id='affect-trail'
+)
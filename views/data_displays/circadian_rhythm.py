@@ -2,6 +2,9 @@
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 
+# MiRo dashboard modules
+from views.figures import dashboard_figures
+
 card = dbc.Card(
 	[
 		dbc.CardHeader(
@@ -20,6 +23,7 @@ card = dbc.Card(
 		dbc.CardBody(
 			dcc.Graph(
 				id='circadian-graph',
+				figure=dashboard_figures['circadian'],
 				animate=True,
 				config={'displayModeBar': False},
 				style={
@@ -2,6 +2,10 @@
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 
+# MiRo dashboard modules
+import dashboard_constants as con
+from views.figures import dashboard_figures
+
 card = dbc.Card(
 	[
 		dbc.CardHeader(
@@ -20,6 +24,7 @@ card = dbc.Card(
 		dbc.CardBody(
 			dcc.Graph(
 				id='motivation-graph',
+				figure=dashboard_figures['motivation'],
 				config={'displayModeBar': False},
 				style={
 					'height': '120px',
@@ -38,13 +43,14 @@ card = dbc.Card(
 	color='danger',
 	inverse=True,
 	outline=True,
-	# REMOVE THIS TO ENABLE MOTIVATION GRAPH
-	style={'display': 'none'}
+	# Set MOTIVATION_CARD to enable the motivation graph
+	style=None if con.MOTIVATION_CARD else {'display': 'none'}
 )
 
 modal_tab = dbc.Tab(
 	dcc.Graph(
 		id='motivation-graph-large',
+		figure=dashboard_figures['motivation'],
 		# 'Animate' property is incompatible with changing images
 		# animate=True,
 		config={'displayModeBar': False},
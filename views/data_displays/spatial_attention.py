@@ -35,6 +35,7 @@ card = dbc.Card(
 						),
 						html.Img(
 							id='audio-pri-wide',
+							src=con.STREAM_PATH + 'priw',
 							style={
 								'height': con.PRIW_HEIGHT,
 								'width' : '100%',
@@ -64,6 +65,7 @@ card = dbc.Card(
 							[
 								html.Img(
 									id='camera-img-left',
+									src=con.STREAM_PATH + 'caml',
 									style={
 										# 'height': con.CAM_HEIGHT,
 										# 'width' : con.CAM_WIDTH,
@@ -73,6 +75,7 @@ card = dbc.Card(
 								),
 								html.Img(
 									id='camera-img-right',
+									src=con.STREAM_PATH + 'camr',
 									style={
 										# 'height': con.CAM_HEIGHT,
 										# 'width' : con.CAM_WIDTH
@@ -168,6 +171,7 @@ modal_tab = dbc.Tab(
 					[
 						html.Img(
 							id='camera-img-left-large',
+							src=con.STREAM_PATH + 'caml?size=large',
 							style={
 								'height': con.CAM_HEIGHT_LARGE,
 								'width' : con.CAM_WIDTH_LARGE
@@ -175,6 +179,7 @@ modal_tab = dbc.Tab(
 						),
 						html.Img(
 							id='camera-img-right-large',
+							src=con.STREAM_PATH + 'camr?size=large',
 							style={
 								'height': con.CAM_HEIGHT_LARGE,
 								'width' : con.CAM_WIDTH_LARGE
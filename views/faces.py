@@ -1,6 +1,9 @@
 # MiRo dashboard modules
 import dashboard_constants as con
 
+# Other modules
+import math
+
 # Affect faces
 affect_faces = {
 	'0.0': {
@@ -41,3 +44,41 @@ sleep_faces = {
 	'0.50': con.ASSET_PATH + 'face_no_mouth.png',
 	'0.75': con.ASSET_PATH + 'face_no_mouth.png',
 }
+
+
+# Faces ordered by bucket, so a value can be mapped straight to its face
+# Valence buckets are 0.2 wide and arousal buckets 0.3 wide, each covering (lower, upper]
+AFFECT_STEP = {
+	'valence': 0.2,
+	'arousal': 0.3,
+}
+SLEEP_STEP = 0.25
+affect_face_grid = [[affect_faces[x][y] for y in sorted(affect_faces[x])] for x in sorted(affect_faces)]
+sleep_face_list = [sleep_faces[x] for x in sorted(sleep_faces)]
+
+
+def face_index(value, step, count):
+	# Index of the (lower, upper] bucket containing value, or None if it's outside all of them
+	index = int(math.ceil(value / step)) - 1
+	if 0 <= index < count:
+		return index
+
+	return None
+
+
+def get_affect_face(valence, arousal):
+	# Get the appropriate face from the 'faces' dictionary based on current mood values
+	x = face_index(valence, AFFECT_STEP['valence'], len(affect_face_grid))
+	y = face_index(arousal, AFFECT_STEP['arousal'], len(affect_face_grid[0]))
+	if x is None or y is None:
+		return None
+
+	return affect_face_grid[x][y]
+
+
+def get_sleep_face(wakefulness):
+	x = face_index(wakefulness, SLEEP_STEP, len(sleep_face_list))
+	if x is None:
+		return None
+
+	return sleep_face_list[x]
@@ -0,0 +1,172 @@
+# MiRo dashboard modules
+import dashboard_constants as con
+from views.layouts import dashboard_layouts
+
+# Trace styles for the live data displays, as plain dicts so they needn't be validated every time they're used
+dashboard_traces = {
+	# Action selection
+	'action_input'     : {
+		'type'       : 'bar',
+		'hoverinfo'  : 'text+y',
+		# Format input label to three decimal places
+		# 'hovertext'  : np.round(-action_priority, decimals=3),
+		'marker'     : {'color': '#F39C12'},  # Match header colour
+		'name'       : 'Input',
+		'orientation': 'h',
+		'x'          : [],
+		# Labels never change, so only bar lengths are sent afterwards
+		'y'          : dashboard_layouts['action_list'],
+	},
+	'action_output'    : {
+		'type'       : 'bar',
+		'hoverinfo'  : 'none',
+		'marker'     : {'color': '#95a5a6'},  # Match Flatly theme grey
+		'name'       : 'Output',
+		'orientation': 'h',
+		'x'          : [],
+		'y'          : dashboard_layouts['action_list'],
+	},
+
+	# Affect
+	'emotion'          : {
+		'type'   : 'scatter',
+		# TODO: Make hovertext show both X and Y values together
+		'marker' : {
+			'color': 'steelblue',
+			'size' : 15,
+			'line' : {
+				'width': 0.5,
+				'color': 'black'
+			}
+		},
+		'mode'   : 'markers',
+		'name'   : 'Emotion',
+		'opacity': 0.7,
+		'x'      : [],
+		'y'      : [],
+	},
+	'mood'             : {
+		'type'   : 'scatter',
+		'marker' : {
+			'color': 'seagreen',
+			'size' : 15,
+			'line' : {
+				'width': 0.5,
+				'color': 'black'
+			}
+		},
+		'mode'   : 'markers',
+		'name'   : 'Mood',
+		'opacity': 0.7,
+		'x'      : [],
+		'y'      : [],
+	},
+	'sleep'            : {
+		'type'   : 'scatter',
+		'marker' : {
+			'color': 'salmon',
+			'size' : 15,
+			'line' : {
+				'width': 0.5,
+				'color': 'black'
+			}
+		},
+		'mode'   : 'markers',
+		'name'   : 'Wakefulness',
+		'opacity': 0.7,
+		'x'      : [],
+		'y'      : [],
+	},
+
+	# Affect trajectories, drawn with WebGL so long histories stay smooth
+	# Markers are coloured by sample number, so older samples fade out
+	'emotion_trail'    : {
+		'type'     : 'scattergl',
+		'hoverinfo': 'none',
+		'marker'   : {
+			'color'     : [],
+			'colorscale': [[0, 'rgba(70, 130, 180, 0)'], [1, 'rgba(70, 130, 180, 0.8)']],  # Steelblue
+			'size'      : 5,
+		},
+		'mode'     : 'markers',
+		'name'     : 'Emotion',
+		'x'        : [],
+		'y'        : [],
+	},
+	'mood_trail'       : {
+		'type'     : 'scattergl',
+		'hoverinfo': 'none',
+		'marker'   : {
+			'color'     : [],
+			'colorscale': [[0, 'rgba(46, 139, 87, 0)'], [1, 'rgba(46, 139, 87, 0.8)']],  # Seagreen
+			'size'      : 5,
+		},
+		'mode'     : 'markers',
+		'name'     : 'Mood',
+		'x'        : [],
+		'y'        : [],
+	},
+
+	# Motivation
+	'motivation_social': {
+		'type'     : 'scatter',
+		'hoverinfo': 'none',
+		'marker'   : {
+			'color': 'steelblue',
+			'size' : 15,
+			'line' : {'width': 0.5}
+		},
+		'mode'     : 'lines',
+		'name'     : 'Social',
+		'opacity'  : 0.7,
+		'x'        : list(range(con.MOTIVATION_LENGTH)),
+		'y'        : [],
+	},
+	'motivation_ball'  : {
+		'type'     : 'scatter',
+		'hoverinfo': 'none',
+		'marker'   : {
+			'color': 'mediumseagreen',
+			'size' : 15,
+			'line' : {'width': 0.5}
+		},
+		'mode'     : 'lines',
+		'name'     : 'Ball',
+		'opacity'  : 0.7,
+		'x'        : list(range(con.MOTIVATION_LENGTH)),
+		'y'        : [],
+	},
+}
+
+# Initial figures, sent once with the page layout
+# Callbacks then only send new data for these graphs (via 'extendData') rather than whole figures
+dashboard_figures = {
+	'action'      : {
+		'data'  : [dashboard_traces['action_input'], dashboard_traces['action_output']],
+		'layout': dashboard_layouts['action_layout']
+	},
+	'affect'      : {
+		'data'  : [dashboard_traces['emotion'], dashboard_traces['mood'], dashboard_traces['sleep']],
+		'layout': dashboard_layouts['affect_layout']
+	},
+	'affect_large': {
+		'data'  : [dashboard_traces['emotion'], dashboard_traces['mood']],
+		'layout': dashboard_layouts['affect_layout']
+	},
+	'affect_trail': {
+		'data'  : [dashboard_traces['emotion_trail'], dashboard_traces['mood_trail']],
+		'layout': dashboard_layouts['affect_layout']
+	},
+	'sleep_large' : {
+		'data'  : [dashboard_traces['sleep']],
+		'layout': dashboard_layouts['sleep_layout']
+	},
+	'circadian'   : {
+		'data'  : [],
+		'layout': dashboard_layouts['circadian_layout']
+	},
+	'motivation'  : {
+		'data'  : [dashboard_traces['motivation_social'], dashboard_traces['motivation_ball']],
+		'layout': dashboard_layouts['motivation_layout']
+	},
+}
@@ -41,6 +41,19 @@ dashboard_layouts = {
 
 	# Affect
 	'affect_layout'    : go.Layout(
+		# Background face, chosen in the browser from the current mood or wakefulness (see assets/clientside.js)
+		images=[{
+			'layer'  : 'below',
+			'opacity': 0.8,
+			'sizing' : 'contain',
+			'sizex'  : 0.3,
+			'sizey'  : 0.3,
+			# 'source' : face,
+			'x'      : 0.5,
+			'y'      : 0.5,
+			'xanchor': 'center',
+			'yanchor': 'middle'
+		}],
 		legend={
 			'orientation': 'h',
 			'x'          : 0.5,
@@ -77,6 +90,45 @@ dashboard_layouts = {
 		},
 	),
 
+	# Circadian rhythm
+	# Clock hands are drawn in the browser (see assets/clientside.js)
+	'circadian_layout' : go.Layout(
+		# images=[{
+		# 	'opacity': 1,
+		# 	'sizing' : 'contain',
+		# 	'sizex'  : 1,
+		# 	'sizey'  : 1,
+		# 	'source' : con.ASSET_PATH + 'clock_' + str(circ_input) + '.png',
+		# 	'x'      : 0.5,
+		# 	'y'      : 0.5,
+		# 	'xanchor': 'center',
+		# 	'yanchor': 'middle'
+		# }],
+		margin={
+			'b': 20,
+			'l': 20,
+			'r': 20,
+			't': 20
+		},
+		polar={
+			'angularaxis': {
+				'direction': 'clockwise',
+				'rotation' : 60,
+				'showgrid' : False,
+				'thetaunit': 'degrees',
+				'tickmode' : 'array',
+				'ticktext' : ['{:d}'.format(hr) for hr in range(1, 13)],
+				'tickvals' : [d for d in range(0, 360, 30)],
+				'type'     : 'linear'
+			},
+			'radialaxis' : {
+				'range'  : [0, 1],
+				'visible': False
+			},
+		},
+		showlegend=False
+	),
+
 	# Motivation
 	'motivation_layout': go.Layout(
 		legend={
@@ -32,10 +32,14 @@ dashboard_modals = html.Div([
 		[
 			dbc.ModalHeader('Affect'),
 			dbc.ModalBody(
-				dbc.Tabs([
-					dashboard_tabs['affect_graph'],
-					dashboard_tabs['affect_info']
-				])
+				dbc.Tabs(
+					[
+						dashboard_tabs['affect_graph'],
+						dashboard_tabs['affect_trail'],
+						dashboard_tabs['affect_info']
+					],
+					id='affect-tabs'
+				)
 			),
 			dbc.ModalFooter(
 				dbc.Button(
@@ -16,7 +16,14 @@ from views.data_displays import (
 
 dashboard_rows = {
 	'Row_top': dbc.Row(
-		dbc.Col(dashboard_alerts['to_higher']),
+		[
+			dbc.Col(dashboard_alerts['to_higher']),
+			# Robot selector, filled in when more than one robot is configured (see models/callback_robot.py)
+			dbc.Col(
+				html.Div(id='robot-select'),
+				width='auto'
+			),
+		],
 		no_gutters=True
 	),
 
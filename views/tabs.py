@@ -75,6 +75,7 @@ dashboard_tabs = {
 		label='Information'
 	),
 	'affect_graph'    : affect.modal_tab,
+	'affect_trail'    : affect.trail_tab,
 	'affect_info'     : dbc.Tab(
 		[
 			dbc.Alert(